@@ -19,36 +19,23 @@ def add_vendor_role():
     """Add 'vendor' to the user_role enum if it doesn't exist"""
     
     try:
-        # First, let's check current enum values
         print("Checking current user_role enum values...")
         
-        # Try to create a test user with vendor role to see if it works
-        test_data = {
-            "email": "test_vendor_role@test.com",
-            "password_hash": "dummy_hash", 
-            "first_name": "Test",
-            "last_name": "Vendor",
-            "role": "vendor",
-            "is_active": False  # Make it inactive so it doesn't interfere
-        }
-        
-        # Try inserting to see if vendor role is accepted
-        response = supabase.table("users").insert(test_data).execute()
+        # Single read-only RPC; see database/has_enum_value.sql
+        response = supabase.rpc("has_enum_value", {"t": "user_role", "v": "vendor"}).execute()
         
         if response.data:
             print("✅ 'vendor' role already exists in user_role enum")
-            # Clean up test user
-            supabase.table("users").delete().eq("email", "test_vendor_role@test.com").execute()
         else:
-            print("❌ 'vendor' role does not exist in user_role enum")
-            print("Need to add it manually via Supabase SQL Editor")
-            
-    except Exception as e:
-        if "invalid input value for enum user_role" in str(e):
             print("❌ 'vendor' role does not exist in user_role enum")
             print("\nTo fix this, run the following SQL in your Supabase SQL Editor:")
             print("\nALTER TYPE user_role ADD VALUE 'vendor';")
             print("\nThis will add 'vendor' as a valid role option.")
+            
+    except Exception as e:
+        if "has_enum_value" in str(e):
+            print("❌ has_enum_value() is missing")
+            print("Run database/has_enum_value.sql in your Supabase SQL Editor first")
         else:
             print(f"❌ Error checking enum: {e}")
 
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """
 CommunityExpress API Test Suite
-Comprehensive testing of all API endpoints with JSON output
+Comprehensive testing of all API endpoints with JSON Lines output
 """
 
-import requests
+import aiohttp
+import asyncio
 import json
+import orjson
 import time
 from datetime import datetime
 from typing import Dict, List, Any
@@ -15,6 +17,10 @@ class APITestSuite:
         self.base_url = base_url
         self.token = None
         self.headers = {}
+        # Opened in run_all_tests; one pooled keep-alive session for the whole run
+        self.session = None
+        # Only the running summary stays in memory; each endpoint result is
+        # streamed to the .jsonl file as soon as it is logged
         self.test_results = {
             "test_session": {
                 "timestamp": datetime.now().isoformat(),
@@ -23,9 +29,13 @@ class APITestSuite:
                 "passed": 0,
                 "failed": 0,
                 "success_rate": 0.0
-            },
-            "endpoints": []
+            }
         }
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.results_filename = f"api_test_results_{timestamp}.jsonl"
+        self.summary_filename = f"api_test_summary_{timestamp}.json"
+        # Opened in run_all_tests, which closes it however the run ends
+        self._results_file = None
         
     def log_test(self, endpoint: str, method: str, status_code: int, 
                  response_time: float, success: bool, response_data: Any = None, 
@@ -42,7 +52,7 @@ class APITestSuite:
             "response_data": response_data,
             "error": error
         }
-        self.test_results["endpoints"].append(result)
+        self._results_file.write(orjson.dumps(result, default=str) + b"\n")
         
         if success:
             self.test_results["test_session"]["passed"] += 1
@@ -51,7 +61,7 @@ class APITestSuite:
             
         self.test_results["test_session"]["total_endpoints"] += 1
         
-    def authenticate(self):
+    async def authenticate(self):
         """Authenticate and get JWT token"""
         print("🔐 Authenticating...")
         
@@ -66,7 +76,8 @@ class APITestSuite:
         }
         
         try:
-            requests.post(register_url, json=register_data)
+            async with self.session.post(register_url, json=register_data):
+                pass
         except:
             pass  # User might already exist
         
@@ -79,22 +90,23 @@ class APITestSuite:
         
         start_time = time.time()
         try:
-            response = requests.post(url, json=data)
+            async with self.session.post(url, json=data) as response:
+                response_text = await response.text()
             response_time = time.time() - start_time
             
-            if response.status_code == 200:
-                result = response.json()
+            if response.status == 200:
+                result = json.loads(response_text)
                 self.token = result.get("access_token")
                 self.headers = {"Authorization": f"Bearer {self.token}"}
-                self.log_test("/auth/login", "POST", response.status_code, 
+                self.log_test("/auth/login", "POST", response.status, 
                             response_time, True, result, request_data=data)
                 print("✅ Authentication successful")
                 return True
             else:
-                self.log_test("/auth/login", "POST", response.status_code, 
-                            response_time, False, response.text, 
-                            f"Login failed: {response.status_code}", data)
-                print(f"❌ Authentication failed: {response.status_code}")
+                self.log_test("/auth/login", "POST", response.status, 
+                            response_time, False, response_text, 
+                            f"Login failed: {response.status}", data)
+                print(f"❌ Authentication failed: {response.status}")
                 return False
                 
         except Exception as e:
@@ -104,7 +116,7 @@ class APITestSuite:
             print(f"❌ Authentication error: {e}")
             return False
     
-    def test_endpoint(self, endpoint: str, method: str = "GET", 
+    async def test_endpoint(self, endpoint: str, method: str = "GET", 
                      data: Dict = None, params: Dict = None, 
                      description: str = ""):
         """Test a single endpoint"""
@@ -114,32 +126,37 @@ class APITestSuite:
         start_time = time.time()
         try:
             if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params)
+                request = self.session.get(url, headers=self.headers, params=params)
             elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
+                request = self.session.post(url, headers=self.headers, json=data)
             elif method == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
+                request = self.session.put(url, headers=self.headers, json=data)
             elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers)
+                request = self.session.delete(url, headers=self.headers)
             else:
                 raise ValueError(f"Unsupported method: {method}")
+            
+            async with request as response:
+                response_text = await response.text()
                 
             response_time = time.time() - start_time
             
             try:
-                response_data = response.json()
+                response_data = json.loads(response_text)
             except:
-                response_data = response.text
+                response_data = response_text
             
-            success = 200 <= response.status_code < 300
+            success = 200 <= response.status < 300
             status_icon = "✅" if success else "❌"
             
-            self.log_test(endpoint, method, response.status_code, response_time, 
+            # No await between here and the append, so concurrent tests
+            # cannot interleave their updates to test_results
+            self.log_test(endpoint, method, response.status, response_time, 
                          success, response_data, 
-                         None if success else f"HTTP {response.status_code}", 
+                         None if success else f"HTTP {response.status}", 
                          data or params)
             
-            print(f"   {status_icon} {response.status_code} ({response_time*1000:.0f}ms)")
+            print(f"   {status_icon} {response.status} {method} {endpoint} ({response_time*1000:.0f}ms)")
             
             return success, response_data
             
@@ -147,29 +164,41 @@ class APITestSuite:
             response_time = time.time() - start_time
             self.log_test(endpoint, method, 0, response_time, False, 
                          None, str(e), data or params)
-            print(f"   ❌ Error: {e}")
+            print(f"   ❌ {method} {endpoint} error: {e}")
             return False, None
     
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run comprehensive test suite"""
+        connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=30)
+        with open(self.results_filename, "ab") as results_file:
+            self._results_file = results_file
+            async with aiohttp.ClientSession(connector=connector) as session:
+                self.session = session
+                return await self._run_all_tests()
+    
+    async def _run_all_tests(self):
         print("🚀 Starting CommunityExpress API Test Suite")
         print("=" * 60)
         
         # Authenticate first
-        if not self.authenticate():
+        if not await self.authenticate():
             print("❌ Cannot proceed without authentication")
             return
-            
+        
+        # Read-only endpoints within a section don't depend on each other,
+        # so they run concurrently; create -> get -> update chains stay sequential
         print("\n📊 Testing Dashboard Endpoints")
         print("-" * 40)
-        self.test_endpoint("/dashboard/stats", "GET", description="Dashboard statistics")
-        self.test_endpoint("/dashboard/recent-orders", "GET", description="Recent orders")
-        self.test_endpoint("/dashboard/top-vendors", "GET", description="Top vendors")
-        self.test_endpoint("/dashboard/revenue-trends", "GET", description="Revenue trends")
+        await asyncio.gather(
+            self.test_endpoint("/dashboard/stats", "GET", description="Dashboard statistics"),
+            self.test_endpoint("/dashboard/recent-orders", "GET", description="Recent orders"),
+            self.test_endpoint("/dashboard/top-vendors", "GET", description="Top vendors"),
+            self.test_endpoint("/dashboard/revenue-trends", "GET", description="Revenue trends"),
+        )
         
         print("\n🏘️  Testing Community Endpoints")
         print("-" * 40)
-        self.test_endpoint("/communities", "GET", description="List all communities")
+        await self.test_endpoint("/communities", "GET", description="List all communities")
         
         # Test community creation
         community_data = {
@@ -178,7 +207,7 @@ class APITestSuite:
             "location": "Test Location",
             "contact_email": "test@example.com"
         }
-        success, community_result = self.test_endpoint("/communities", "POST", 
+        success, community_result = await self.test_endpoint("/communities", "POST", 
                                                       community_data, 
                                                       description="Create new community")
         
@@ -186,7 +215,7 @@ class APITestSuite:
         if success and community_result:
             community_id = community_result.get("id")
             if community_id:
-                self.test_endpoint(f"/communities/{community_id}", "GET", 
+                await self.test_endpoint(f"/communities/{community_id}", "GET", 
                                  description="Get community by ID")
                 
                 # Update community
@@ -194,18 +223,20 @@ class APITestSuite:
                     "name": f"Updated Test Community {int(time.time())}",
                     "description": "Updated by API test suite"
                 }
-                self.test_endpoint(f"/communities/{community_id}", "PUT", 
+                await self.test_endpoint(f"/communities/{community_id}", "PUT", 
                                  update_data, description="Update community")
         
         print("\n🏪 Testing Vendor Endpoints")
         print("-" * 40)
-        self.test_endpoint("/vendors", "GET", description="List all vendors")
-        self.test_endpoint("/vendors/stats", "GET", description="Vendor statistics")
-        self.test_endpoint("/vendors/search", "GET", 
-                          params={"q": "test"}, description="Search vendors")
-        self.test_endpoint("/vendors/by-type", "GET", 
-                          params={"vendor_type": "restaurant"}, 
-                          description="Get vendors by type")
+        await asyncio.gather(
+            self.test_endpoint("/vendors", "GET", description="List all vendors"),
+            self.test_endpoint("/vendors/stats", "GET", description="Vendor statistics"),
+            self.test_endpoint("/vendors/search", "GET", 
+                              params={"q": "test"}, description="Search vendors"),
+            self.test_endpoint("/vendors/by-type", "GET", 
+                              params={"vendor_type": "restaurant"}, 
+                              description="Get vendors by type"),
+        )
         
         # Test vendor creation if we have a community
         if community_id:
@@ -218,7 +249,7 @@ class APITestSuite:
                 "community_id": community_id,
                 "description": "Test vendor created by API suite"
             }
-            success, vendor_result = self.test_endpoint("/vendors", "POST", 
+            success, vendor_result = await self.test_endpoint("/vendors", "POST", 
                                                        vendor_data, 
                                                        description="Create new vendor")
             
@@ -226,29 +257,35 @@ class APITestSuite:
             if success and vendor_result:
                 vendor_id = vendor_result.get("id")
                 if vendor_id:
-                    self.test_endpoint(f"/vendors/{vendor_id}", "GET", 
+                    await self.test_endpoint(f"/vendors/{vendor_id}", "GET", 
                                      description="Get vendor by ID")
         
         print("\n📦 Testing Product Endpoints")
         print("-" * 40)
-        self.test_endpoint("/products", "GET", description="List all products")
-        self.test_endpoint("/products/categories", "GET", description="Product categories")
-        self.test_endpoint("/products/search", "GET", 
-                          params={"q": "test"}, description="Search products")
+        await asyncio.gather(
+            self.test_endpoint("/products", "GET", description="List all products"),
+            self.test_endpoint("/products/categories", "GET", description="Product categories"),
+            self.test_endpoint("/products/search", "GET", 
+                              params={"q": "test"}, description="Search products"),
+        )
         
         print("\n📋 Testing Order Endpoints")
         print("-" * 40)
-        self.test_endpoint("/orders", "GET", description="List all orders")
-        self.test_endpoint("/orders/stats", "GET", description="Order statistics")
+        await asyncio.gather(
+            self.test_endpoint("/orders", "GET", description="List all orders"),
+            self.test_endpoint("/orders/stats", "GET", description="Order statistics"),
+        )
         
         print("\n💳 Testing Payment Endpoints")
         print("-" * 40)
-        self.test_endpoint("/payments", "GET", description="List all payments")
-        self.test_endpoint("/payments/stats", "GET", description="Payment statistics")
+        await asyncio.gather(
+            self.test_endpoint("/payments", "GET", description="List all payments"),
+            self.test_endpoint("/payments/stats", "GET", description="Payment statistics"),
+        )
         
         print("\n🔐 Testing Auth Endpoints")
         print("-" * 40)
-        self.test_endpoint("/auth/me", "GET", description="Get current user")
+        await self.test_endpoint("/auth/me", "GET", description="Get current user")
         
         # Calculate success rate
         total = self.test_results["test_session"]["total_endpoints"]
@@ -264,33 +301,33 @@ class APITestSuite:
         print(f"Failed: {self.test_results['test_session']['failed']}")
         print(f"Success Rate: {success_rate:.1f}%")
         
-        # Save results to JSON file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"api_test_results_{timestamp}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(self.test_results, f, indent=2, default=str)
+        # Save summary; per-endpoint results are already in the .jsonl file
+        with open(self.summary_filename, 'wb') as f:
+            f.write(orjson.dumps(self.test_results, default=str, option=orjson.OPT_INDENT_2))
         
-        print(f"\n💾 Results saved to: {filename}")
+        print(f"\n💾 Results saved to: {self.results_filename}")
+        print(f"💾 Summary saved to: {self.summary_filename}")
         
         # Clean up test data if created
         if community_id:
             print(f"\n🧹 Cleaning up test community: {community_id}")
-            self.test_endpoint(f"/communities/{community_id}", "DELETE", 
-                             description="Cleanup test community")
+            await self.test_endpoint(f"/communities/{community_id}", "DELETE", 
+                                   description="Cleanup test community")
         
         return self.test_results
 
-def main():
+async def main():
     """Main function to run the test suite"""
     print("CommunityExpress API Test Suite")
-    print("Comprehensive testing with JSON output")
+    print("Comprehensive testing with JSON Lines output")
     print()
     
     # Check if server is running
     try:
-        response = requests.get("http://localhost:8004/docs")
-        if response.status_code != 200:
+        async with aiohttp.ClientSession() as session:
+            async with session.get("http://localhost:8004/docs") as response:
+                status_code = response.status
+        if status_code != 200:
             print("❌ Server not responding at localhost:8004")
             print("Please make sure the FastAPI server is running")
             return
@@ -301,10 +338,10 @@ def main():
     
     # Run tests
     suite = APITestSuite()
-    results = suite.run_all_tests()
+    results = await suite.run_all_tests()
     
     print("\n🎉 Test suite completed!")
     return results
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
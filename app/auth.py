@@ -1,22 +1,125 @@
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import NamedTuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+import jwt
+from jwt import InvalidTokenError
+import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from dateutil import parser
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.database import get_supabase_client
+from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, BCRYPT_ROUNDS
+from app.database import get_table, get_pg_pool
 from app.models import UserResponse
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-security = HTTPBearer()
+# Missing credentials are rejected by our own dependencies with a 401
+security = HTTPBearer(auto_error=False)
+
+class TokenUser(NamedTuple):
+    """Identity carried in the access token, enough for role-guarded endpoints"""
+    id: str
+    role: str
+
+# Every column the UserResponse needs, and nothing else (notably not password_hash)
+USER_COLUMNS = "id,email,first_name,last_name,phone,role,community_id,apartment_number,is_active,created_at,updated_at"
+USER_BY_ID_SQL = f"SELECT {USER_COLUMNS} FROM users WHERE id = $1"
+
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+_decode_jwt = functools.partial(
+    jwt.decode, key=SECRET_KEY, algorithms=[ALGORITHM], options={"require": ["exp", "sub"]}
+)
+
+# bcrypt releases the GIL, so hashing on this pool runs in parallel
+# without blocking the event loop
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# Short-lived caches keyed by a hash of the bearer token so repeated requests
+# skip the JWT decode and the users lookup
+_payload_cache = TTLCache(maxsize=10000, ttl=30)
+_user_cache = TTLCache(maxsize=5000, ttl=60)
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+def _decode_token(token: str) -> Optional[dict]:
+    cache_key = _token_cache_key(token)
+    payload = _payload_cache.get(cache_key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    
+    try:
+        payload = _decode_jwt(token)
+    except InvalidTokenError:
+        return None
+    
+    _payload_cache[cache_key] = payload
+    return payload
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp as returned by Supabase"""
+    value = value.replace("Z", "+00:00")
+    # Python < 3.11 only accepts exactly 3 or 6 fractional digits
+    value = _FRACTION_RE.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value, count=1)
+    return datetime.fromisoformat(value)
+
+async def _fetch_user_row(user_id: str) -> Optional[dict]:
+    pool = get_pg_pool()
+    if pool is not None:
+        # asyncpg prepares and caches the statement per connection
+        row = await pool.fetchrow(USER_BY_ID_SQL, user_id)
+        if row is None:
+            return None
+        user_data = dict(row)
+        user_data["id"] = str(user_data["id"])
+        if user_data["community_id"] is not None:
+            user_data["community_id"] = str(user_data["community_id"])
+        return user_data
+    
+    response = get_table("users").select(USER_COLUMNS).eq("id", user_id).limit(1).execute()
+    if not response.data:
+        return None
+    user_data = response.data[0]
+    user_data["created_at"] = parse_timestamp(user_data["created_at"])
+    user_data["updated_at"] = parse_timestamp(user_data["updated_at"])
+    return user_data
+
+def invalidate_user_cache(user_id: str):
+    """Drop cached users so the next request reloads them from the database"""
+    for cache_key, (cached_user, _) in list(_user_cache.items()):
+        if cached_user.id == user_id:
+            _user_cache.pop(cache_key, None)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS"""
+    # bcrypt hashes look like $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        _HASH_POOL, verify_password, plain_password, hashed_password
+    )
+
+async def aget_password_hash(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_HASH_POOL, get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -29,65 +132,61 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        return user_id
-    except JWTError as e:
-        return None
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserResponse:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> UserResponse:
+    credentials_exception = _credentials_exception()
+    if credentials is None:
+        raise credentials_exception
+    
+    cache_key = _token_cache_key(credentials.credentials)
+    cached = _user_cache.get(cache_key)
+    if cached is not None:
+        cached_user, exp = cached
+        if exp > time.time():
+            return cached_user
+        _user_cache.pop(cache_key, None)
     
-    user_id = verify_token(credentials.credentials)
-    if user_id is None:
+    # Decoded once; the payload cache makes repeat tokens skip the HMAC check
+    payload = _decode_token(credentials.credentials)
+    if payload is None:
         raise credentials_exception
+    user_id = payload["sub"]
     
-    supabase = get_supabase_client()
     try:
-        response = supabase.table("users").select("*").eq("id", user_id).execute()
-        if not response.data:
+        user_data = await _fetch_user_row(user_id)
+        if user_data is None:
             raise credentials_exception
         
-        user_data = response.data[0]
-        
-        # Fix datetime parsing - handle microseconds properly
-        created_at_str = user_data["created_at"]
-        updated_at_str = user_data["updated_at"]
-        
-        # Parse datetime strings more robustly
-        created_at = parser.parse(created_at_str)
-        updated_at = parser.parse(updated_at_str)
-        
-        return UserResponse(
-            id=user_data["id"],
-            email=user_data["email"],
-            first_name=user_data["first_name"],
-            last_name=user_data["last_name"],
-            phone=user_data.get("phone"),
-            role=user_data["role"],
-            community_id=user_data.get("community_id"),
-            apartment_number=user_data.get("apartment_number"),
-            is_active=user_data["is_active"],
-            created_at=created_at,
-            updated_at=updated_at
-        )
+        # Row comes straight from our own users table with USER_COLUMNS,
+        # so skip re-validating it field by field
+        user = UserResponse.model_construct(**user_data)
+        _user_cache[cache_key] = (user, payload.get("exp", 0))
+        return user
     except Exception as e:
         raise credentials_exception
 
 def require_role(required_roles: list):
-    def role_checker(current_user: UserResponse = Depends(get_current_user)):
-        if current_user.role not in required_roles:
+    # Same role set -> same dependency object, so FastAPI can reuse its
+    # per-request result across routes and sub-dependencies
+    return _role_checker(frozenset(required_roles))
+
+@functools.lru_cache(maxsize=None)
+def _role_checker(required_roles: frozenset):
+    # Checks the user's current role and is_active flag, not the token's role
+    # claim, so demotions and deactivations apply within the 60s user cache;
+    # endpoints behind it only get the user's id and role
+    async def role_checker(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> TokenUser:
+        user = await get_current_user(credentials)
+        if not user.is_active or user.role not in required_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
             )
-        return current_user
+        return TokenUser(id=user.id, role=user.role)
     return role_checker
\ No newline at end of file
@@ -0,0 +1,17 @@
+import hashlib
+from fastapi import Request, Response, status
+
+# Cached listings are stored as (ETag, JSON body) tuples
+
+def cache_listing(cache, key, body: bytes) -> tuple:
+    """Store a serialized listing in `cache` under `key` together with its ETag"""
+    cached = (f'"{hashlib.md5(body).hexdigest()}"', body)
+    cache[key] = cached
+    return cached
+
+def etag_response(request: Request, cached: tuple) -> Response:
+    """Serve a cached listing, or 304 when the client already has it"""
+    etag, body = cached
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
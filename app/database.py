@@ -1,7 +1,74 @@
+from functools import lru_cache
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from urllib.parse import urlparse
+import asyncpg
 from supabase import create_client, Client
-from app.config import SUPABASE_URL, SUPABASE_KEY
+from app.config import SUPABASE_URL, SUPABASE_KEY, DATABASE_URL
+
+# Fail at startup rather than on the first request
+if not SUPABASE_URL or not SUPABASE_KEY:
+    raise ValueError(f"Missing Supabase configuration: URL={bool(SUPABASE_URL)}, KEY={bool(SUPABASE_KEY)}")
+
+_client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def get_supabase_client() -> Client:
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError(f"Missing Supabase configuration: URL={bool(SUPABASE_URL)}, KEY={bool(SUPABASE_KEY)}")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+    """Process-wide Supabase client, shared so every request reuses its keep-alive connections"""
+    return _client
+
+@lru_cache(maxsize=None)
+def get_table(table_name: str):
+    # Request builders are stateless; select/insert/update each return a fresh query
+    return _client.table(table_name)
+
+def newest_first(query, limit: Optional[int] = None, before: Optional[datetime] = None, before_id: Optional[UUID] = None):
+    """Keyset page of a select, ordered (created_at, id) newest first.
+    
+    The cursor is the created_at and id of the last row on the previous page; id breaks
+    ties between rows sharing a created_at. With only `before`, tied rows may be skipped.
+    Without `limit` every matching row is returned, as the unpaged listings always did.
+    """
+    # Typed cursor values are formatted here, so they cannot alter the filter syntax
+    if before is not None and before_id is not None:
+        created_at = before.isoformat()
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{before_id})')
+    elif before is not None:
+        query = query.lt("created_at", before.isoformat())
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    return query.limit(limit) if limit is not None else query
+
+def ilike_pattern(term: str) -> str:
+    """Build a quoted PostgREST ilike value matching `term` anywhere"""
+    # Escape LIKE wildcards first, then quote/escape for PostgREST's or=() syntax
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    escaped = escaped.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"%{escaped}%"'
+
+# Supavisor's transaction-mode port; connections there are shared between
+# clients, so server-side prepared statements can vanish between queries
+TRANSACTION_POOLER_PORT = 6543
+
+_pg_pool: Optional[asyncpg.Pool] = None
+
+async def init_pg_pool():
+    global _pg_pool
+    if DATABASE_URL and _pg_pool is None:
+        statement_cache_size = 0 if urlparse(DATABASE_URL).port == TRANSACTION_POOLER_PORT else 100
+        _pg_pool = await asyncpg.create_pool(
+            dsn=DATABASE_URL,
+            min_size=2,
+            max_size=10,
+            command_timeout=30,
+            statement_cache_size=statement_cache_size
+        )
+
+async def close_pg_pool():
+    global _pg_pool
+    if _pg_pool is not None:
+        await _pg_pool.close()
+        _pg_pool = None
+
+def get_pg_pool() -> Optional[asyncpg.Pool]:
+    """Direct Postgres pool, or None when DATABASE_URL is not configured"""
+    return _pg_pool
\ No newline at end of file
@@ -1,20 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from app.config import CORS_ORIGINS
+from app.database import init_pg_pool, close_pg_pool
 from app.routers import auth, orders, vendors, products, payments, communities, dashboard, laundry
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_pg_pool()
+    yield
+    await close_pg_pool()
+
 app = FastAPI(
     title="CommunityExpress API",
     description="Community marketplace application API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    # If-None-Match/ETag let browsers revalidate cached listings with a 304
+    allow_headers=["Authorization", "Content-Type", "X-Testing", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -36,5 +50,15 @@ async def health_check():
     return {"status": "healthy", "message": "CommunityExpress API is running"}
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
\ No newline at end of file
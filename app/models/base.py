@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -14,6 +14,8 @@ class UserCreate(BaseModel):
     community_id: Optional[str] = None
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     email: str
     first_name: str
@@ -47,6 +49,8 @@ class CommunityCreate(BaseModel):
     postal_code: Optional[str] = None
 
 class CommunityResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     name: str
     description: Optional[str] = None
@@ -73,6 +77,8 @@ class VendorCreate(BaseModel):
     operating_hours: Optional[Dict[str, str]] = None
 
 class VendorResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     name: str
     type: str
@@ -99,6 +105,8 @@ class ProductCreate(BaseModel):
     is_available: bool = True
 
 class ProductResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     vendor_id: str
     vendor_name: Optional[str] = None
@@ -134,6 +142,8 @@ class OrderCreate(BaseModel):
     payment_method: Optional[str] = None
 
 class OrderItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     product_id: str
     product_name: str
@@ -143,6 +153,8 @@ class OrderItemResponse(BaseModel):
     special_instructions: Optional[str] = None
 
 class OrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     user_id: str
     user_name: str
@@ -168,6 +180,7 @@ class OrderResponse(BaseModel):
 class PaymentStatus(str, Enum):
     PENDING = "pending"
     PROCESSING = "processing"
+    PAID = "paid"
     COMPLETED = "completed"
     FAILED = "failed"
     REFUNDED = "refunded"
@@ -179,6 +192,8 @@ class PaymentCreate(BaseModel):
     payment_reference: Optional[str] = None
 
 class PaymentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     order_id: str
     user_id: str
@@ -189,4 +204,10 @@ class PaymentResponse(BaseModel):
     transaction_id: Optional[str] = None
     gateway_response: Optional[Dict[str, Any]] = None
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+# Built once at import; the vendor product list validates and serializes through this
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[ProductResponse])
+
+# The vendor list endpoint validates and serializes cached responses through this
+VENDOR_LIST_ADAPTER = TypeAdapter(List[VendorResponse])
\ No newline at end of file
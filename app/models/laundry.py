@@ -1,15 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 from enum import Enum
+from .base import PaymentStatus
 
 # Laundry specific models
 
+# "HH:MM-HH:MM" on a 24h clock, e.g. "10:00-12:00"
+PICKUP_TIME_SLOT_PATTERN = r"^(?:[01]\d|2[0-3]):[0-5]\d-(?:[01]\d|2[0-3]):[0-5]\d$"
+
 class LaundryVendorCreate(BaseModel):
     business_name: str
     description: Optional[str] = None
     pickup_time_start: str = "08:00"
-    pickup_time_end: str = "18:00"  
+    pickup_time_end: str = "18:00"
     delivery_time_hours: int = 24
     minimum_order_amount: float = 100.0
     pickup_charge: float = 20.0
@@ -29,6 +33,8 @@ class LaundryVendorUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 class LaundryVendorResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     vendor_id: str
     business_name: str
@@ -62,6 +68,8 @@ class LaundryItemUpdate(BaseModel):
     image_url: Optional[str] = None
 
 class LaundryItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     laundry_vendor_id: str
     name: str
@@ -74,12 +82,23 @@ class LaundryItemResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class LaundryOrderStatus(str, Enum):
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    PICKED_UP = "picked_up"
+    IN_PROCESS = "in_process"
+    READY = "ready"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+
 class LaundryOrderItemCreate(BaseModel):
     laundry_item_id: str
     quantity: int = Field(gt=0)
     special_instructions: Optional[str] = None
 
 class LaundryOrderItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     laundry_item_id: str
     quantity: int
@@ -94,14 +113,14 @@ class LaundryOrderCreate(BaseModel):
     laundry_vendor_id: str
     pickup_address: str
     pickup_date: date
-    pickup_time_slot: str
+    pickup_time_slot: str = Field(pattern=PICKUP_TIME_SLOT_PATTERN)
     pickup_instructions: Optional[str] = None
     delivery_address: Optional[str] = None
     delivery_instructions: Optional[str] = None
     items: List[LaundryOrderItemCreate]
 
 class LaundryOrderUpdate(BaseModel):
-    status: Optional[str] = None
+    status: Optional[LaundryOrderStatus] = None
     pickup_instructions: Optional[str] = None
     delivery_address: Optional[str] = None
     delivery_instructions: Optional[str] = None
@@ -109,6 +128,8 @@ class LaundryOrderUpdate(BaseModel):
     estimated_delivery_time: Optional[str] = None
 
 class LaundryOrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     id: str
     user_id: str
     laundry_vendor_id: str
@@ -121,13 +142,13 @@ class LaundryOrderResponse(BaseModel):
     estimated_delivery_date: Optional[date] = None
     estimated_delivery_time: Optional[str] = None
     delivery_instructions: Optional[str] = None
-    status: str
+    status: LaundryOrderStatus
     subtotal: float
     pickup_charge: float
     delivery_charge: float
     tax_amount: float
     total_amount: float
-    payment_status: str
+    payment_status: PaymentStatus
     payment_method: Optional[str] = None
     payment_reference: Optional[str] = None
     confirmed_at: Optional[datetime] = None
@@ -147,6 +168,8 @@ class LaundryPaymentRequest(BaseModel):
     payment_reference: Optional[str] = None
 
 class LaundryPaymentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
     success: bool
     payment_reference: str
     message: str
@@ -173,4 +196,8 @@ class LaundryUserStats(BaseModel):
     delivered_orders: int
     total_spent: float
     favorite_vendor: Optional[str] = None
-    recent_orders: List[LaundryOrderResponse]
\ No newline at end of file
+    recent_orders: List[LaundryOrderResponse]
+
+# Built once at import; the dashboard endpoints validate and serialize through these
+LAUNDRY_VENDOR_DASHBOARD_ADAPTER = TypeAdapter(LaundryVendorDashboard)
+LAUNDRY_USER_STATS_ADAPTER = TypeAdapter(LaundryUserStats)
\ No newline at end of file
@@ -2,10 +2,12 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from datetime import timedelta
 from pydantic import BaseModel
 from app.models import UserCreate, UserResponse, LoginRequest, Token
-from app.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.auth import aget_password_hash, averify_password, create_access_token, get_current_user, invalidate_user_cache, parse_timestamp, password_needs_rehash, USER_COLUMNS
 from app.database import get_supabase_client
 from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
 
+supabase = get_supabase_client()
+
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 # Request models for user updates
@@ -15,20 +17,26 @@ class UpdateCommunityRequest(BaseModel):
 class UpdateApartmentRequest(BaseModel):
     apartment_number: str
 
+def _user_response(row: dict) -> UserResponse:
+    """Build a UserResponse from a users row we just read or wrote"""
+    # Trusted DB row, so skip field-by-field validation (never use for request bodies)
+    fields = {k: row[k] for k in UserResponse.model_fields if k in row}
+    fields["created_at"] = parse_timestamp(row["created_at"])
+    fields["updated_at"] = parse_timestamp(row["updated_at"])
+    return UserResponse.model_construct(**fields)
+
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate):
-    supabase = get_supabase_client()
-    
     # Check if user already exists
-    existing_user = supabase.table("users").select("*").eq("email", user.email).execute()
-    if existing_user.data:
+    existing_user = supabase.table("users").select("id", count="exact", head=True).eq("email", user.email).execute()
+    if existing_user.count:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Hash password and create user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await aget_password_hash(user.password)
     
     user_data = {
         "email": user.email,
@@ -50,19 +58,7 @@ async def register(user: UserCreate):
             )
         
         created_user = response.data[0]
-        return UserResponse(
-            id=created_user["id"],
-            email=created_user["email"],
-            first_name=created_user["first_name"],
-            last_name=created_user["last_name"],
-            phone=created_user.get("phone"),
-            role=created_user["role"],
-            community_id=created_user.get("community_id"),
-            apartment_number=created_user.get("apartment_number"),
-            is_active=created_user["is_active"],
-            created_at=created_user["created_at"],
-            updated_at=created_user["updated_at"]
-        )
+        return _user_response(created_user)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -71,44 +67,35 @@ async def register(user: UserCreate):
 
 @router.post("/login", response_model=Token)
 async def login(login_data: LoginRequest):
-    supabase = get_supabase_client()
-    
     # Get user by email
-    response = supabase.table("users").select("*").eq("email", login_data.email).execute()
-    if not response.data:
+    response = supabase.table("users").select(f"{USER_COLUMNS},password_hash").eq("email", login_data.email).maybe_single().execute()
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    user_data = response.data[0]
+    user_data = response.data
     
-    # Verify password
-    if not verify_password(login_data.password, user_data["password_hash"]):
+    # Verify password (bcrypt is slow, keep it off the event loop)
+    if not await averify_password(login_data.password, user_data["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    # Bring old hashes up to the configured cost now that we have the plain password
+    if password_needs_rehash(user_data["password_hash"]):
+        new_hash = await aget_password_hash(login_data.password)
+        supabase.table("users").update({"password_hash": new_hash}).eq("id", user_data["id"]).execute()
+    
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user_data["id"]}, expires_delta=access_token_expires
     )
     
-    user_response = UserResponse(
-        id=user_data["id"],
-        email=user_data["email"],
-        first_name=user_data["first_name"],
-        last_name=user_data["last_name"],
-        phone=user_data.get("phone"),
-        role=user_data["role"],
-        community_id=user_data.get("community_id"),
-        apartment_number=user_data.get("apartment_number"),
-        is_active=user_data["is_active"],
-        created_at=user_data["created_at"],
-        updated_at=user_data["updated_at"]
-    )
+    user_response = _user_response(user_data)
     
     return Token(
         access_token=access_token,
@@ -125,17 +112,15 @@ async def join_community(
     community_code: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     # Get community by code
-    community_response = supabase.table("communities").select("*").eq("code", community_code).execute()
-    if not community_response.data:
+    community_response = supabase.table("communities").select("id,name").eq("code", community_code).maybe_single().execute()
+    if community_response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid community code"
         )
     
-    community = community_response.data[0]
+    community = community_response.data
     
     # Update user's community
     try:
@@ -149,6 +134,7 @@ async def join_community(
                 detail="Failed to join community"
             )
         
+        invalidate_user_cache(current_user.id)
         return {"message": "Successfully joined community", "community_name": community["name"]}
     except Exception as e:
         raise HTTPException(
@@ -162,17 +148,15 @@ async def update_user_community(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Update the current user's community"""
-    supabase = get_supabase_client()
-    
     # Verify community exists and is active
-    community_response = supabase.table("communities").select("*").eq("id", request.community_id).execute()
-    if not community_response.data:
+    community_response = supabase.table("communities").select("is_active").eq("id", request.community_id).maybe_single().execute()
+    if community_response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Community not found"
         )
     
-    community = community_response.data[0]
+    community = community_response.data
     if not community.get("is_active", True):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -191,21 +175,11 @@ async def update_user_community(
                 detail="Failed to update community"
             )
         
+        invalidate_user_cache(current_user.id)
+        
         # Return updated user data
         updated_user = update_response.data[0]
-        return UserResponse(
-            id=updated_user["id"],
-            email=updated_user["email"],
-            first_name=updated_user["first_name"],
-            last_name=updated_user["last_name"],
-            phone=updated_user.get("phone"),
-            role=updated_user["role"],
-            community_id=updated_user.get("community_id"),
-            apartment_number=updated_user.get("apartment_number"),
-            is_active=updated_user["is_active"],
-            created_at=updated_user["created_at"],
-            updated_at=updated_user["updated_at"]
-        )
+        return _user_response(updated_user)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -218,8 +192,6 @@ async def update_user_apartment(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Update the current user's apartment number"""
-    supabase = get_supabase_client()
-    
     try:
         # Update user's apartment number
         update_response = supabase.table("users").update({
@@ -232,21 +204,11 @@ async def update_user_apartment(
                 detail="Failed to update apartment number"
             )
         
+        invalidate_user_cache(current_user.id)
+        
         # Return updated user data
         updated_user = update_response.data[0]
-        return UserResponse(
-            id=updated_user["id"],
-            email=updated_user["email"],
-            first_name=updated_user["first_name"],
-            last_name=updated_user["last_name"],
-            phone=updated_user.get("phone"),
-            role=updated_user["role"],
-            community_id=updated_user.get("community_id"),
-            apartment_number=updated_user.get("apartment_number"),
-            is_active=updated_user["is_active"],
-            created_at=updated_user["created_at"],
-            updated_at=updated_user["updated_at"]
-        )
+        return _user_response(updated_user)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
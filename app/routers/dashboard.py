@@ -1,13 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from datetime import datetime, timedelta
-from app.database import get_supabase_client
-from app.auth import get_current_user
+from cachetools import TTLCache
+from app.database import get_supabase_client, get_pg_pool
+from app.auth import get_current_user, require_role, TokenUser
 from app.models import UserResponse
 from pydantic import BaseModel
 
+supabase = get_supabase_client()
+
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+# Used when DATABASE_URL is set, skipping the PostgREST hop
+DASHBOARD_STATS_SQL = "SELECT * FROM dashboard_stats()"
+RECENT_ACTIVITIES_SQL = "SELECT * FROM recent_activities($1)"
+COMMUNITY_PERFORMANCE_SQL = (
+    "SELECT id, name, code, user_count, vendor_count, order_count, revenue "
+    "FROM mv_community_performance ORDER BY revenue DESC"
+)
+
+# Dashboard figures are fine a minute stale; cache them per endpoint (and days for trends).
+# The cache lives in this worker process only, so other workers expire on their own TTL
+_dashboard_cache = TTLCache(maxsize=128, ttl=60)
+
+def private_cache_headers(response: Response):
+    """Let the admin UI reuse a dashboard response for 30s (never shared caches)"""
+    response.headers["Cache-Control"] = "private, max-age=30, stale-while-revalidate=60"
+
 class DashboardStats(BaseModel):
     totalCommunities: int
     totalVendors: int
@@ -31,265 +51,174 @@ class RecentActivity(BaseModel):
     icon: str
     color: str
 
-@router.get("/stats", response_model=DashboardStats)
+async def _names_by_id(supabase, table: str, ids: List[str]) -> dict:
+    """Map id -> name for the given rows of `table` in a single IN query"""
+    if not ids:
+        return {}
+    response = await asyncio.to_thread(supabase.table(table).select("id, name").in_("id", ids).execute)
+    return {row["id"]: row["name"] for row in response.data}
+
+@router.get("/stats", response_model=DashboardStats, dependencies=[Depends(private_cache_headers)])
 async def get_dashboard_stats(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get master dashboard statistics"""
-    supabase = get_supabase_client()
+    cached = _dashboard_cache.get("stats")
+    if cached is not None:
+        return cached
     
     try:
-        # Get communities count
-        communities_response = supabase.table("communities").select("id").eq("is_active", True).execute()
-        total_communities = len(communities_response.data)
-        
-        # Get vendors count
-        vendors_response = supabase.table("vendors").select("id").eq("is_active", True).execute()
-        total_vendors = len(vendors_response.data)
-        
-        # Get users count
-        users_response = supabase.table("users").select("id, updated_at").eq("is_active", True).execute()
-        total_users = len(users_response.data)
-        
-        # Calculate active users (updated in last 7 days)
-        seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        active_users = len([u for u in users_response.data if u["updated_at"] > seven_days_ago])
-        
-        # Get orders
-        orders_response = supabase.table("orders").select("id, status, total_amount").execute()
-        total_orders = len(orders_response.data)
-        
-        # Calculate order stats and revenue
-        pending_orders = len([o for o in orders_response.data if o["status"] == "pending"])
-        completed_orders = len([o for o in orders_response.data if o["status"] == "completed"])
-        total_revenue = sum([o.get("total_amount", 0) for o in orders_response.data if o["status"] == "completed"])
-        
-        return DashboardStats(
-            totalCommunities=total_communities,
-            totalVendors=total_vendors,
-            totalUsers=total_users,
-            totalOrders=total_orders,
-            totalRevenue=float(total_revenue),
-            activeUsers=active_users,
-            pendingOrders=pending_orders,
-            completedOrders=completed_orders
+        # All eight figures come back as one row; see database/dashboard_stats.sql
+        pool = get_pg_pool()
+        if pool is not None:
+            row = await pool.fetchrow(DASHBOARD_STATS_SQL)
+        else:
+            row = (await asyncio.to_thread(supabase.rpc("dashboard_stats").execute)).data[0]
+        
+        stats = DashboardStats(
+            totalCommunities=row["total_communities"],
+            totalVendors=row["total_vendors"],
+            totalUsers=row["total_users"],
+            totalOrders=row["total_orders"],
+            totalRevenue=float(row["total_revenue"]),
+            activeUsers=row["active_users"],
+            pendingOrders=row["pending_orders"],
+            completedOrders=row["completed_orders"]
         )
+        _dashboard_cache["stats"] = stats
+        return stats
     except Exception as e:
         print(f"Error fetching dashboard stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch dashboard statistics")
 
-@router.get("/order-trends", response_model=List[OrderTrend])
+@router.get("/order-trends", response_model=List[OrderTrend], dependencies=[Depends(private_cache_headers)])
 async def get_order_trends(
     days: int = 7,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get order trends for the specified number of days"""
-    supabase = get_supabase_client()
+    cached = _dashboard_cache.get(("trends", days))
+    if cached is not None:
+        return cached
     
     try:
         # Get orders from the last N days
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        orders_response = supabase.table("orders").select("created_at, status, total_amount").gte("created_at", start_date).execute()
+        now = datetime.now()
+        start_date = (now - timedelta(days=days)).isoformat()
+        orders_response = await asyncio.to_thread(supabase.table("orders").select("created_at, status, total_amount").gte("created_at", start_date).execute)
         
-        # Group orders by date
-        trends = {}
+        # [orders, revenue] per day, pre-filled so days without orders still show up
+        today = now.date()
+        trends = {(today - timedelta(days=days-1-i)).isoformat(): [0, 0] for i in range(days)}
         
-        # Initialize all days with 0
-        for i in range(days):
-            date = (datetime.now() - timedelta(days=days-1-i)).strftime('%Y-%m-%d')
-            trends[date] = {"orders": 0, "revenue": 0}
-        
-        # Populate with actual data
+        # ISO-8601 timestamps start with YYYY-MM-DD, so slice instead of parsing
         for order in orders_response.data:
-            order_date = datetime.fromisoformat(order["created_at"].replace('Z', '+00:00')).strftime('%Y-%m-%d')
-            if order_date in trends:
-                trends[order_date]["orders"] += 1
+            day = trends.get(order["created_at"][:10])
+            if day is not None:
+                day[0] += 1
                 if order["status"] == "completed":
-                    trends[order_date]["revenue"] += order.get("total_amount", 0)
+                    day[1] += order.get("total_amount", 0)
         
-        # Convert to list format
-        result = []
-        for date in sorted(trends.keys()):
-            result.append(OrderTrend(
-                date=date,
-                orders=trends[date]["orders"],
-                revenue=float(trends[date]["revenue"])
-            ))
+        # Keys were inserted oldest first; response_model validates the dicts once on the way out
+        result = [
+            {"date": date, "orders": orders, "revenue": float(revenue)}
+            for date, (orders, revenue) in trends.items()
+        ]
         
+        _dashboard_cache[("trends", days)] = result
         return result
     except Exception as e:
         print(f"Error fetching order trends: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch order trends")
 
-@router.get("/recent-activities", response_model=List[RecentActivity])
+@router.get("/recent-activities", response_model=List[RecentActivity], dependencies=[Depends(private_cache_headers)])
 async def get_recent_activities(
     limit: int = 10,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get recent platform activities"""
-    supabase = get_supabase_client()
-    
     try:
-        activities = []
-        
-        # Get recent user registrations (last 7 days)
-        seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        
-        users_response = supabase.table("users").select("id, first_name, last_name, created_at, community_id").gte("created_at", seven_days_ago).order("created_at", desc=True).limit(3).execute()
-        
-        for user in users_response.data:
-            # Get community name
-            community_name = "Unknown Community"
-            if user.get("community_id"):
-                community_response = supabase.table("communities").select("name").eq("id", user["community_id"]).execute()
-                if community_response.data:
-                    community_name = community_response.data[0]["name"]
-            
-            activities.append(RecentActivity(
-                id=str(user["id"]),
-                type="new_user",
-                message=f"New user {user['first_name']} {user['last_name']} registered in {community_name}",
-                timestamp=user["created_at"],
-                icon="person-add",
-                color="#22c55e"
-            ))
-        
-        # Get recent orders (last 24 hours)
-        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-        
-        orders_response = supabase.table("orders").select("id, created_at, vendor_id").gte("created_at", yesterday).order("created_at", desc=True).limit(3).execute()
-        
-        for order in orders_response.data:
-            # Get vendor name
-            vendor_name = "Unknown Vendor"
-            vendor_response = supabase.table("vendors").select("name").eq("id", order["vendor_id"]).execute()
-            if vendor_response.data:
-                vendor_name = vendor_response.data[0]["name"]
-            
-            activities.append(RecentActivity(
-                id=str(order["id"]),
-                type="new_order",
-                message=f"Order #{str(order['id'])[:8]} placed for {vendor_name}",
-                timestamp=order["created_at"],
-                icon="bag",
-                color="#3b82f6"
-            ))
+        # The four feeds are merged, sorted and limited in SQL; see database/recent_activities.sql
+        pool = get_pg_pool()
+        if pool is not None:
+            rows = await pool.fetch(RECENT_ACTIVITIES_SQL, limit)
+            return [{**row, "timestamp": row["timestamp"].isoformat()} for row in rows]
         
-        # Get recently activated vendors (last 24 hours)
-        vendors_response = supabase.table("vendors").select("id, name, updated_at").eq("is_active", True).gte("updated_at", yesterday).order("updated_at", desc=True).limit(2).execute()
-        
-        for vendor in vendors_response.data:
-            activities.append(RecentActivity(
-                id=str(vendor["id"]),
-                type="vendor_active",
-                message=f"{vendor['name']} went online",
-                timestamp=vendor["updated_at"],
-                icon="checkmark-circle",
-                color="#10b981"
-            ))
-        
-        # Get recent payments (last 24 hours)
-        payments_response = supabase.table("payments").select("id, amount, created_at").eq("status", "paid").gte("created_at", yesterday).order("created_at", desc=True).limit(2).execute()
-        
-        for payment in payments_response.data:
-            activities.append(RecentActivity(
-                id=str(payment["id"]),
-                type="payment",
-                message=f"Payment of ${payment['amount']} received",
-                timestamp=payment["created_at"],
-                icon="card",
-                color="#f59e0b"
-            ))
-        
-        # Sort by timestamp and limit
-        activities.sort(key=lambda x: x.timestamp, reverse=True)
-        return activities[:limit]
+        response = await asyncio.to_thread(supabase.rpc("recent_activities", {"limit_n": limit}).execute)
+        return response.data
         
     except Exception as e:
         print(f"Error fetching recent activities: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch recent activities")
 
-@router.get("/community-performance")
+@router.get("/community-performance", dependencies=[Depends(private_cache_headers)])
 async def get_community_performance(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get community performance metrics"""
-    supabase = get_supabase_client()
+    cached = _dashboard_cache.get("community-performance")
+    if cached is not None:
+        return cached
     
     try:
-        communities_response = supabase.table("communities").select("*").eq("is_active", True).execute()
+        # Snapshot of community_stats_v refreshed every 5 minutes; see database/community_performance_mv.sql
+        pool = get_pg_pool()
+        if pool is not None:
+            rows = await pool.fetch(COMMUNITY_PERFORMANCE_SQL)
+        else:
+            # The snapshot is not exposed to PostgREST, so read the live view
+            response = await asyncio.to_thread(supabase.table("community_stats_v").select(
+                "id, name, code, user_count, vendor_count, order_count, revenue"
+            ).order("revenue", desc=True).execute)
+            rows = response.data
         
         performance = []
-        for community in communities_response.data:
-            community_id = community["id"]
-            
-            # Get user count
-            users_response = supabase.table("users").select("id").eq("community_id", community_id).eq("is_active", True).execute()
-            user_count = len(users_response.data)
-            
-            # Get vendor count
-            vendors_response = supabase.table("vendors").select("id").eq("community_id", community_id).eq("is_active", True).execute()
-            vendor_count = len(vendors_response.data)
-            
-            # Get order count and revenue
-            order_count = 0
-            revenue = 0
-            
-            if vendors_response.data:
-                vendor_ids = [v["id"] for v in vendors_response.data]
-                for vendor_id in vendor_ids:
-                    orders_response = supabase.table("orders").select("total_amount, status").eq("vendor_id", vendor_id).execute()
-                    order_count += len(orders_response.data)
-                    
-                    for order in orders_response.data:
-                        if order.get("status") == "completed":
-                            revenue += order.get("total_amount", 0)
-            
-            avg_order_value = revenue / order_count if order_count > 0 else 0
-            
+        for row in rows:
+            revenue = float(row["revenue"])
+            order_count = row["order_count"]
             performance.append({
-                "id": str(community_id),
-                "name": community["name"],
-                "code": community["code"],
-                "userCount": user_count,
-                "vendorCount": vendor_count,
+                "id": str(row["id"]),
+                "name": row["name"],
+                "code": row["code"],
+                "userCount": row["user_count"],
+                "vendorCount": row["vendor_count"],
                 "orderCount": order_count,
-                "revenue": float(revenue),
-                "avgOrderValue": float(avg_order_value)
+                "revenue": revenue,
+                "avgOrderValue": revenue / order_count if order_count > 0 else 0.0
             })
         
-        # Sort by revenue descending
-        performance.sort(key=lambda x: x["revenue"], reverse=True)
+        _dashboard_cache["community-performance"] = performance
         return performance
     except Exception as e:
         print(f"Error fetching community performance: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch community performance")
 
-@router.get("/vendor-performance")
+@router.get("/vendor-performance", dependencies=[Depends(private_cache_headers)])
 async def get_vendor_performance(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get vendor performance metrics"""
-    supabase = get_supabase_client()
+    cached = _dashboard_cache.get("vendor-performance")
+    if cached is not None:
+        return cached
     
     try:
-        vendors_response = supabase.table("vendors").select("*").execute()
+        # One pre-aggregated row per vendor; see database/vendor_stats_view.sql
+        vendors_response = await asyncio.to_thread(supabase.table("vendor_stats_v").select(
+            "id, name, type, is_active, community_id, order_count, revenue"
+        ).execute)
+        
+        # Community names for every vendor in one IN query
+        community_ids = list({v["community_id"] for v in vendors_response.data if v.get("community_id")})
+        community_names = await _names_by_id(supabase, "communities", community_ids)
         
         performance = []
         for vendor in vendors_response.data:
             vendor_id = vendor["id"]
+            community_name = community_names.get(vendor["community_id"], "Unknown")
             
-            # Get community name
-            community_name = "Unknown"
-            community_response = supabase.table("communities").select("name").eq("id", vendor["community_id"]).execute()
-            if community_response.data:
-                community_name = community_response.data[0]["name"]
-            
-            # Get order stats
-            orders_response = supabase.table("orders").select("total_amount, status").eq("vendor_id", vendor_id).execute()
-            order_count = len(orders_response.data)
-            
-            revenue = sum([o.get("total_amount", 0) for o in orders_response.data if o.get("status") == "completed"])
+            order_count = vendor["order_count"]
+            revenue = vendor["revenue"]
             avg_order_value = revenue / order_count if order_count > 0 else 0
             
             performance.append({
@@ -305,7 +234,19 @@ async def get_vendor_performance(
         
         # Sort by revenue descending
         performance.sort(key=lambda x: x["revenue"], reverse=True)
+        _dashboard_cache["vendor-performance"] = performance
         return performance
     except Exception as e:
         print(f"Error fetching vendor performance: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch vendor performance")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch vendor performance")
+
+@router.post("/invalidate")
+async def invalidate_dashboard_cache(
+    current_user: TokenUser = Depends(require_role(["master"]))
+):
+    """Drop this worker's cached dashboard figures so its next request recomputes them.
+    
+    Other workers keep their cached figures until the 60s TTL expires.
+    """
+    _dashboard_cache.clear()
+    return {"message": "Dashboard cache cleared for this worker process; other workers refresh within 60s"}
\ No newline at end of file
@@ -1,20 +1,78 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Request
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Request, Response
 from typing import List, Optional
-from datetime import datetime, date
-from decimal import Decimal
+from datetime import datetime, timezone
+from collections import defaultdict
 from app.models.laundry import (
     LaundryVendorCreate, LaundryVendorUpdate, LaundryVendorResponse,
     LaundryItemCreate, LaundryItemUpdate, LaundryItemResponse,
     LaundryOrderCreate, LaundryOrderUpdate, LaundryOrderResponse,
     LaundryPaymentRequest, LaundryPaymentResponse,
-    LaundryVendorDashboard, LaundryVendorStats, LaundryUserStats
+    LaundryVendorDashboard, LaundryUserStats,
+    LAUNDRY_VENDOR_DASHBOARD_ADAPTER, LAUNDRY_USER_STATS_ADAPTER
 )
 from app.models import UserResponse
 from app.auth import get_current_user
 from app.database import get_supabase_client
+from postgrest.exceptions import APIError
+
+supabase = get_supabase_client()
 
 router = APIRouter(prefix="/laundry", tags=["laundry"])
 
+# Orders a user is still waiting on
+OPEN_ORDER_STATUSES = frozenset({"pending", "confirmed", "picked_up", "in_process"})
+
+# Columns backing the response models, so reads don't pull whole rows
+LAUNDRY_VENDOR_COLUMNS = "id,vendor_id,business_name,description,pickup_time_start,pickup_time_end,delivery_time_hours,minimum_order_amount,pickup_charge,delivery_charge,service_areas,is_active,created_at,updated_at"
+LAUNDRY_ITEM_COLUMNS = "id,laundry_vendor_id,name,description,category,price_per_piece,estimated_time_hours,is_available,image_url,created_at,updated_at"
+LAUNDRY_ORDER_COLUMNS = "id,user_id,laundry_vendor_id,order_number,pickup_address,pickup_date,pickup_time_slot,pickup_instructions,delivery_address,estimated_delivery_date,estimated_delivery_time,delivery_instructions,status,subtotal,pickup_charge,delivery_charge,tax_amount,total_amount,payment_status,payment_method,payment_reference,confirmed_at,picked_up_at,ready_at,delivered_at,cancelled_at,created_at,updated_at"
+LAUNDRY_ORDER_ITEM_COLUMNS = "id,laundry_order_id,laundry_item_id,quantity,unit_price,total_price,special_instructions"
+
+# SQLSTATE raised by database functions for missing rows
+NOT_FOUND_ERROR = "P0002"
+
+LOCALHOSTS = frozenset({"127.0.0.1", "localhost", "::1"})
+
+# Mock user returned for localhost testing requests; built once since it never changes
+TEST_USER = UserResponse(
+    id="test-user-id",
+    email="test@testing.com",
+    first_name="Test",
+    last_name="User",
+    role="master",
+    community_id="test-community-id",
+    is_active=True,
+    created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+)
+
+def _order_item_response(item: dict) -> dict:
+    """Flatten a laundry_order_items row with its embedded laundry_items fields"""
+    return {
+        "id": item["id"],
+        "laundry_item_id": item["laundry_item_id"],
+        "quantity": item["quantity"],
+        "unit_price": item["unit_price"],
+        "total_price": item["total_price"],
+        "special_instructions": item["special_instructions"],
+        "item_name": item["laundry_items"]["name"],
+        "item_category": item["laundry_items"]["category"],
+        "item_description": item["laundry_items"]["description"]
+    }
+
+def _item_insert_data(vendor_id: str, item_data: LaundryItemCreate) -> dict:
+    """laundry_items row for a new item of the given vendor"""
+    return {
+        "laundry_vendor_id": vendor_id,
+        "name": item_data.name,
+        "description": item_data.description,
+        "category": item_data.category,
+        "price_per_piece": float(item_data.price_per_piece),
+        "estimated_time_hours": item_data.estimated_time_hours,
+        "image_url": item_data.image_url
+    }
+
 # Laundry Vendor Management Endpoints
 
 async def get_current_user_or_testing(
@@ -23,29 +81,28 @@ async def get_current_user_or_testing(
     user: UserResponse = Depends(get_current_user)
 ):
     """Get current user or allow testing mode only for localhost"""
-    from dateutil import parser
-    
-    # Check if request is from localhost and testing header is present
-    host = request.client.host if request.client else ""
-    is_localhost = host in ["127.0.0.1", "localhost", "::1"]
-    
-    if is_localhost and x_testing == "true":
-        # Return a mock user for testing (only in localhost)
-        return UserResponse(
-            id="test-user-id",
-            email="test@testing.com",
-            first_name="Test",
-            last_name="User",
-            role="master",
-            community_id="test-community-id",
-            is_active=True,
-            created_at=parser.parse("2024-01-01T00:00:00Z"),
-            updated_at=parser.parse("2024-01-01T00:00:00Z")
-        )
+    # Only look at the client host when the testing header is present
+    if x_testing == "true":
+        host = request.client.host if request.client else ""
+        if host in LOCALHOSTS:
+            # Return a mock user for testing (only in localhost)
+            return TEST_USER
     
     # For production requests, return the authenticated user
     return user
 
+async def _assert_vendor_owner(vendor_id: str, current_user: UserResponse):
+    """Raise unless the laundry vendor belongs to the current user's vendor account"""
+    # Embed the parent vendor so ownership is resolved in a single round trip
+    vendor_check = await asyncio.to_thread(
+        supabase.table("laundry_vendors").select("id, vendors!inner(admin_id)").eq("id", vendor_id).maybe_single().execute
+    )
+    if vendor_check is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
+    
+    if vendor_check.data["vendors"]["admin_id"] != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
 @router.post("/vendors", response_model=LaundryVendorResponse)
 async def create_laundry_vendor(
     vendor_data: LaundryVendorCreate,
@@ -58,16 +115,15 @@ async def create_laundry_vendor(
             detail="Only masters and vendors can create laundry vendor profiles"
         )
     
-    supabase = get_supabase_client()
-    
     try:
         # Insert laundry vendor data
         vendor_insert_data = {
             "vendor_id": vendor_data.vendor_id,
             "business_name": vendor_data.business_name,
             "description": vendor_data.description,
-            "pickup_time_start": vendor_data.pickup_time_start.strftime("%H:%M:%S"),
-            "pickup_time_end": vendor_data.pickup_time_end.strftime("%H:%M:%S"),
+            # HH:MM strings; Postgres casts them to time
+            "pickup_time_start": vendor_data.pickup_time_start,
+            "pickup_time_end": vendor_data.pickup_time_end,
             "delivery_time_hours": vendor_data.delivery_time_hours,
             "minimum_order_amount": float(vendor_data.minimum_order_amount),
             "pickup_charge": float(vendor_data.pickup_charge),
@@ -75,7 +131,7 @@ async def create_laundry_vendor(
             "service_areas": vendor_data.service_areas
         }
         
-        response = supabase.table("laundry_vendors").insert(vendor_insert_data).execute()
+        response = await asyncio.to_thread(supabase.table("laundry_vendors").insert(vendor_insert_data).execute)
         
         if not response.data:
             raise HTTPException(
@@ -84,7 +140,7 @@ async def create_laundry_vendor(
             )
         
         created_vendor = response.data[0]
-        return LaundryVendorResponse(**created_vendor)
+        return created_vendor
         
     except Exception as e:
         raise HTTPException(
@@ -99,13 +155,11 @@ async def get_laundry_vendors(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Get all laundry vendors (optionally filtered by community)"""
-    supabase = get_supabase_client()
-    
     try:
         if community_id or (current_user.community_id and current_user.role == "user"):
             # If we need to filter by community, we need to join with vendors table
-            query = supabase.table("laundry_vendors").select("""
-                *,
+            query = supabase.table("laundry_vendors").select(f"""
+                {LAUNDRY_VENDOR_COLUMNS},
                 vendors!inner(
                     community_id
                 )
@@ -117,14 +171,14 @@ async def get_laundry_vendors(
                 query = query.eq("vendors.community_id", current_user.community_id)
         else:
             # If no community filter needed, just get laundry_vendors
-            query = supabase.table("laundry_vendors").select("*")
+            query = supabase.table("laundry_vendors").select(LAUNDRY_VENDOR_COLUMNS)
             
         if is_active is not None:
             query = query.eq("is_active", is_active)
             
-        response = query.execute()
+        response = await asyncio.to_thread(query.execute)
         
-        return [LaundryVendorResponse(**vendor) for vendor in response.data]
+        return response.data
         
     except Exception as e:
         raise HTTPException(
@@ -138,18 +192,16 @@ async def get_laundry_vendor(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Get a specific laundry vendor by ID"""
-    supabase = get_supabase_client()
-    
     try:
-        response = supabase.table("laundry_vendors").select("*").eq("id", vendor_id).execute()
+        response = await asyncio.to_thread(supabase.table("laundry_vendors").select(LAUNDRY_VENDOR_COLUMNS).eq("id", vendor_id).maybe_single().execute)
         
-        if not response.data:
+        if response is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Laundry vendor not found"
             )
         
-        return LaundryVendorResponse(**response.data[0])
+        return response.data
         
     except HTTPException:
         raise
@@ -166,31 +218,15 @@ async def update_laundry_vendor(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Update a laundry vendor profile"""
-    supabase = get_supabase_client()
-    
     # Check if user owns this vendor or is a master
     if current_user.role not in ["master"]:
-        # Check if current user owns this vendor
-        vendor_check = supabase.table("laundry_vendors").select("vendor_id").eq("id", vendor_id).execute()
-        if not vendor_check.data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
-        
-        # Check if the vendor belongs to current user
-        user_vendor_check = supabase.table("vendors").select("admin_id").eq("id", vendor_check.data[0]["vendor_id"]).execute()
-        if not user_vendor_check.data or user_vendor_check.data[0]["admin_id"] != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        await _assert_vendor_owner(vendor_id, current_user)
     
     try:
-        update_data = {}
-        for field, value in vendor_data.dict(exclude_unset=True).items():
-            if field in ["pickup_time_start", "pickup_time_end"] and value:
-                update_data[field] = value.strftime("%H:%M:%S")
-            elif field in ["minimum_order_amount", "pickup_charge", "delivery_charge"] and value is not None:
-                update_data[field] = float(value)
-            else:
-                update_data[field] = value
+        # JSON mode renders times as HH:MM:SS strings
+        update_data = vendor_data.model_dump(exclude_unset=True, mode="json")
         
-        response = supabase.table("laundry_vendors").update(update_data).eq("id", vendor_id).execute()
+        response = await asyncio.to_thread(supabase.table("laundry_vendors").update(update_data).eq("id", vendor_id).execute)
         
         if not response.data:
             raise HTTPException(
@@ -198,7 +234,7 @@ async def update_laundry_vendor(
                 detail="Laundry vendor not found"
             )
         
-        return LaundryVendorResponse(**response.data[0])
+        return response.data[0]
         
     except HTTPException:
         raise
@@ -217,30 +253,14 @@ async def create_laundry_item(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Create a new laundry item for a vendor"""
-    supabase = get_supabase_client()
-    
     # Verify vendor ownership
     if current_user.role not in ["master"]:
-        vendor_check = supabase.table("laundry_vendors").select("vendor_id").eq("id", vendor_id).execute()
-        if not vendor_check.data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
-        
-        user_vendor_check = supabase.table("vendors").select("admin_id").eq("id", vendor_check.data[0]["vendor_id"]).execute()
-        if not user_vendor_check.data or user_vendor_check.data[0]["admin_id"] != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        await _assert_vendor_owner(vendor_id, current_user)
     
     try:
-        item_insert_data = {
-            "laundry_vendor_id": vendor_id,
-            "name": item_data.name,
-            "description": item_data.description,
-            "category": item_data.category,
-            "price_per_piece": float(item_data.price_per_piece),
-            "estimated_time_hours": item_data.estimated_time_hours,
-            "image_url": item_data.image_url
-        }
+        item_insert_data = _item_insert_data(vendor_id, item_data)
         
-        response = supabase.table("laundry_items").insert(item_insert_data).execute()
+        response = await asyncio.to_thread(supabase.table("laundry_items").insert(item_insert_data).execute)
         
         if not response.data:
             raise HTTPException(
@@ -248,7 +268,7 @@ async def create_laundry_item(
                 detail="Failed to create laundry item"
             )
         
-        return LaundryItemResponse(**response.data[0])
+        return response.data[0]
         
     except HTTPException:
         raise
@@ -258,6 +278,41 @@ async def create_laundry_item(
             detail=f"Failed to create laundry item: {str(e)}"
         )
 
+@router.post("/vendors/{vendor_id}/items/bulk", response_model=List[LaundryItemResponse])
+async def create_laundry_items_bulk(
+    vendor_id: str,
+    items: List[LaundryItemCreate],
+    current_user: UserResponse = Depends(get_current_user_or_testing)
+):
+    """Create several laundry items for a vendor in one insert"""
+    if not items:
+        return []
+    
+    # Verify vendor ownership
+    if current_user.role not in ["master"]:
+        await _assert_vendor_owner(vendor_id, current_user)
+    
+    try:
+        item_insert_data = [_item_insert_data(vendor_id, item_data) for item_data in items]
+        
+        response = await asyncio.to_thread(supabase.table("laundry_items").insert(item_insert_data).execute)
+        
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to create laundry items"
+            )
+        
+        return response.data
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to create laundry items: {str(e)}"
+        )
+
 @router.get("/vendors/{vendor_id}/items", response_model=List[LaundryItemResponse])
 async def get_laundry_items(
     vendor_id: str,
@@ -266,19 +321,17 @@ async def get_laundry_items(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Get all laundry items for a vendor"""
-    supabase = get_supabase_client()
-    
     try:
-        query = supabase.table("laundry_items").select("*").eq("laundry_vendor_id", vendor_id)
+        query = supabase.table("laundry_items").select(LAUNDRY_ITEM_COLUMNS).eq("laundry_vendor_id", vendor_id)
         
         if category:
             query = query.eq("category", category)
         if is_available is not None:
             query = query.eq("is_available", is_available)
             
-        response = query.execute()
+        response = await asyncio.to_thread(query.execute)
         
-        return [LaundryItemResponse(**item) for item in response.data]
+        return response.data
         
     except Exception as e:
         raise HTTPException(
@@ -294,27 +347,14 @@ async def update_laundry_item(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Update a laundry item"""
-    supabase = get_supabase_client()
-    
     # Verify vendor ownership
     if current_user.role not in ["master"]:
-        vendor_check = supabase.table("laundry_vendors").select("vendor_id").eq("id", vendor_id).execute()
-        if not vendor_check.data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
-        
-        user_vendor_check = supabase.table("vendors").select("admin_id").eq("id", vendor_check.data[0]["vendor_id"]).execute()
-        if not user_vendor_check.data or user_vendor_check.data[0]["admin_id"] != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        await _assert_vendor_owner(vendor_id, current_user)
     
     try:
-        update_data = {}
-        for field, value in item_data.dict(exclude_unset=True).items():
-            if field == "price_per_piece" and value is not None:
-                update_data[field] = float(value)
-            else:
-                update_data[field] = value
+        update_data = item_data.model_dump(exclude_unset=True, mode="json")
         
-        response = supabase.table("laundry_items").update(update_data).eq("id", item_id).eq("laundry_vendor_id", vendor_id).execute()
+        response = await asyncio.to_thread(supabase.table("laundry_items").update(update_data).eq("id", item_id).eq("laundry_vendor_id", vendor_id).execute)
         
         if not response.data:
             raise HTTPException(
@@ -322,7 +362,7 @@ async def update_laundry_item(
                 detail="Laundry item not found"
             )
         
-        return LaundryItemResponse(**response.data[0])
+        return response.data[0]
         
     except HTTPException:
         raise
@@ -339,20 +379,12 @@ async def delete_laundry_item(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Delete a laundry item"""
-    supabase = get_supabase_client()
-    
     # Verify vendor ownership
     if current_user.role not in ["master"]:
-        vendor_check = supabase.table("laundry_vendors").select("vendor_id").eq("id", vendor_id).execute()
-        if not vendor_check.data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
-        
-        user_vendor_check = supabase.table("vendors").select("admin_id").eq("id", vendor_check.data[0]["vendor_id"]).execute()
-        if not user_vendor_check.data or user_vendor_check.data[0]["admin_id"] != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        await _assert_vendor_owner(vendor_id, current_user)
     
     try:
-        response = supabase.table("laundry_items").delete().eq("id", item_id).eq("laundry_vendor_id", vendor_id).execute()
+        response = await asyncio.to_thread(supabase.table("laundry_items").delete().eq("id", item_id).eq("laundry_vendor_id", vendor_id).execute)
         
         if not response.data:
             raise HTTPException(
@@ -384,88 +416,34 @@ async def create_laundry_order(
             detail="Only users can create laundry orders"
         )
     
-    supabase = get_supabase_client()
-    
     try:
-        # Generate order number
-        order_number_response = supabase.rpc("generate_laundry_order_number").execute()
-        order_number = order_number_response.data if order_number_response.data else f"LND-{datetime.now().strftime('%Y%m%d')}-001"
-        
-        # Calculate totals
-        subtotal = Decimal('0.00')
-        items_data = []
-        
-        for item in order_data.items:
-            # Get item details and price
-            item_response = supabase.table("laundry_items").select("*").eq("id", item.laundry_item_id).execute()
-            if not item_response.data:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Item {item.laundry_item_id} not found"
-                )
-            
-            item_detail = item_response.data[0]
-            unit_price = Decimal(str(item_detail["price_per_piece"]))
-            total_price = unit_price * item.quantity
-            subtotal += total_price
-            
-            items_data.append({
-                "laundry_item_id": item.laundry_item_id,
-                "quantity": item.quantity,
-                "unit_price": float(unit_price),
-                "total_price": float(total_price),
-                "special_instructions": item.special_instructions
-            })
-        
-        # Get vendor charges
-        vendor_response = supabase.table("laundry_vendors").select("pickup_charge, delivery_charge").eq("id", order_data.laundry_vendor_id).execute()
-        if not vendor_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Laundry vendor not found"
-            )
-        
-        vendor = vendor_response.data[0]
-        pickup_charge = Decimal(str(vendor["pickup_charge"]))
-        delivery_charge = Decimal(str(vendor["delivery_charge"]))
-        tax_amount = (subtotal + pickup_charge + delivery_charge) * Decimal('0.18')  # 18% GST
-        total_amount = subtotal + pickup_charge + delivery_charge + tax_amount
-        
-        # Create order
-        order_insert_data = {
-            "user_id": current_user.id,
-            "laundry_vendor_id": order_data.laundry_vendor_id,
-            "order_number": order_number,
-            "pickup_address": order_data.pickup_address,
-            "pickup_date": order_data.pickup_date.isoformat(),
-            "pickup_time_slot": order_data.pickup_time_slot,
-            "pickup_instructions": order_data.pickup_instructions,
-            "delivery_address": order_data.delivery_address or order_data.pickup_address,
-            "delivery_instructions": order_data.delivery_instructions,
-            "subtotal": float(subtotal),
-            "pickup_charge": float(pickup_charge),
-            "delivery_charge": float(delivery_charge),
-            "tax_amount": float(tax_amount),
-            "total_amount": float(total_amount)
-        }
-        
-        order_response = supabase.table("laundry_orders").insert(order_insert_data).execute()
+        # Pricing, totals and both inserts run in one transaction in the database;
+        # see database/create_laundry_order.sql
+        try:
+            response = await asyncio.to_thread(supabase.rpc("create_laundry_order", {
+                "p_user_id": current_user.id,
+                "p_laundry_vendor_id": order_data.laundry_vendor_id,
+                "p_pickup_address": order_data.pickup_address,
+                "p_pickup_date": order_data.pickup_date.isoformat(),
+                "p_pickup_time_slot": order_data.pickup_time_slot,
+                "p_pickup_instructions": order_data.pickup_instructions,
+                "p_delivery_address": order_data.delivery_address,
+                "p_delivery_instructions": order_data.delivery_instructions,
+                "p_items": [item.dict() for item in order_data.items]
+            }).execute)
+        except APIError as e:
+            if e.code != NOT_FOUND_ERROR:
+                raise
+            # Unknown vendor or item; the function raises with the API's message
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
         
-        if not order_response.data:
+        if not response.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to create laundry order"
             )
         
-        created_order = order_response.data[0]
-        
-        # Create order items
-        for item_data in items_data:
-            item_data["laundry_order_id"] = created_order["id"]
-            supabase.table("laundry_order_items").insert(item_data).execute()
-        
-        # Return complete order with items
-        return await get_laundry_order(created_order["id"], current_user)
+        return response.data
         
     except HTTPException:
         raise
@@ -482,11 +460,9 @@ async def get_laundry_orders(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Get laundry orders (filtered by user role)"""
-    supabase = get_supabase_client()
-    
     try:
-        query = supabase.table("laundry_orders").select("""
-            *,
+        query = supabase.table("laundry_orders").select(f"""
+            {LAUNDRY_ORDER_COLUMNS},
             laundry_vendors!inner(business_name),
             users!inner(first_name, last_name, phone)
         """)
@@ -504,40 +480,31 @@ async def get_laundry_orders(
         if status:
             query = query.eq("status", status)
             
-        response = query.execute()
-        
-        orders = []
-        for order in response.data:
-            # Get order items
-            items_response = supabase.table("laundry_order_items").select("""
-                *,
+        response = await asyncio.to_thread(query.execute)
+        
+        # Fetch the items for every order in one query and group them by order
+        items_by_order = defaultdict(list)
+        order_ids = [order["id"] for order in response.data]
+        if order_ids:
+            items_response = await asyncio.to_thread(supabase.table("laundry_order_items").select(f"""
+                {LAUNDRY_ORDER_ITEM_COLUMNS},
                 laundry_items!inner(name, category, description)
-            """).eq("laundry_order_id", order["id"]).execute()
+            """).in_("laundry_order_id", order_ids).execute)
             
-            items = []
             for item in items_response.data:
-                items.append({
-                    "id": item["id"],
-                    "laundry_item_id": item["laundry_item_id"],
-                    "quantity": item["quantity"],
-                    "unit_price": item["unit_price"],
-                    "total_price": item["total_price"],
-                    "special_instructions": item["special_instructions"],
-                    "item_name": item["laundry_items"]["name"],
-                    "item_category": item["laundry_items"]["category"],
-                    "item_description": item["laundry_items"]["description"]
-                })
-            
-            order_response = {
-                **order,
-                "items": items,
-                "vendor_business_name": order["laundry_vendors"]["business_name"],
-                "user_name": f"{order['users']['first_name']} {order['users']['last_name']}",
-                "user_phone": order["users"]["phone"]
-            }
-            orders.append(LaundryOrderResponse(**order_response))
+                items_by_order[item["laundry_order_id"]].append(_order_item_response(item))
         
-        return orders
+        # Enrich the rows in place rather than copying each into a second list;
+        # response_model validates them once on the way out
+        for order in response.data:
+            vendor = order.pop("laundry_vendors")
+            user = order.pop("users")
+            order["items"] = items_by_order.pop(order["id"], [])
+            order["vendor_business_name"] = vendor["business_name"]
+            order["user_name"] = f"{user['first_name']} {user['last_name']}"
+            order["user_phone"] = user["phone"]
+        
+        return response.data
         
     except HTTPException:
         raise
@@ -553,22 +520,27 @@ async def get_laundry_order(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Get a specific laundry order by ID"""
-    supabase = get_supabase_client()
-    
     try:
-        response = supabase.table("laundry_orders").select("""
-            *,
-            laundry_vendors!inner(business_name),
-            users!inner(first_name, last_name, phone)
-        """).eq("id", order_id).execute()
+        # Fetch the order and its items together; the items are discarded if access is denied
+        response, items_response = await asyncio.gather(
+            asyncio.to_thread(supabase.table("laundry_orders").select(f"""
+                {LAUNDRY_ORDER_COLUMNS},
+                laundry_vendors!inner(business_name),
+                users!inner(first_name, last_name, phone)
+            """).eq("id", order_id).maybe_single().execute),
+            asyncio.to_thread(supabase.table("laundry_order_items").select(f"""
+                {LAUNDRY_ORDER_ITEM_COLUMNS},
+                laundry_items!inner(name, category, description)
+            """).eq("laundry_order_id", order_id).execute)
+        )
         
-        if not response.data:
+        if response is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Laundry order not found"
             )
         
-        order = response.data[0]
+        order = response.data
         
         # Check access permissions
         if current_user.role == "user" and order["user_id"] != current_user.id:
@@ -577,35 +549,15 @@ async def get_laundry_order(
                 detail="Access denied"
             )
         
-        # Get order items
-        items_response = supabase.table("laundry_order_items").select("""
-            *,
-            laundry_items!inner(name, category, description)
-        """).eq("laundry_order_id", order_id).execute()
-        
-        items = []
-        for item in items_response.data:
-            items.append({
-                "id": item["id"],
-                "laundry_item_id": item["laundry_item_id"],
-                "quantity": item["quantity"],
-                "unit_price": item["unit_price"],
-                "total_price": item["total_price"],
-                "special_instructions": item["special_instructions"],
-                "item_name": item["laundry_items"]["name"],
-                "item_category": item["laundry_items"]["category"],
-                "item_description": item["laundry_items"]["description"]
-            })
-        
         order_response = {
             **order,
-            "items": items,
+            "items": [_order_item_response(item) for item in items_response.data],
             "vendor_business_name": order["laundry_vendors"]["business_name"],
             "user_name": f"{order['users']['first_name']} {order['users']['last_name']}",
             "user_phone": order["users"]["phone"]
         }
         
-        return LaundryOrderResponse(**order_response)
+        return order_response
         
     except HTTPException:
         raise
@@ -622,18 +574,22 @@ async def update_laundry_order(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Update a laundry order (mainly status updates by vendors)"""
-    supabase = get_supabase_client()
-    
     try:
-        # Get current order
-        order_response = supabase.table("laundry_orders").select("*").eq("id", order_id).execute()
-        if not order_response.data:
+        # Get current order with everything the response needs, so the update
+        # doesn't have to be followed by a full re-fetch
+        order_response = await asyncio.to_thread(supabase.table("laundry_orders").select(f"""
+            {LAUNDRY_ORDER_COLUMNS},
+            laundry_vendors!inner(business_name),
+            users!inner(first_name, last_name, phone),
+            laundry_order_items({LAUNDRY_ORDER_ITEM_COLUMNS}, laundry_items!inner(name, category, description))
+        """).eq("id", order_id).maybe_single().execute)
+        if order_response is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Laundry order not found"
             )
         
-        current_order = order_response.data[0]
+        current_order = order_response.data
         
         # Permission check
         if current_user.role == "user" and current_order["user_id"] != current_user.id:
@@ -642,12 +598,8 @@ async def update_laundry_order(
                 detail="Access denied"
             )
         
-        update_data = {}
-        for field, value in order_data.dict(exclude_unset=True).items():
-            if field == "pickup_date" and value:
-                update_data[field] = value.isoformat()
-            else:
-                update_data[field] = value
+        # JSON mode renders dates as ISO strings and the status enum as its value
+        update_data = order_data.model_dump(exclude_unset=True, mode="json")
         
         # Add timestamp for status changes
         if "status" in update_data:
@@ -663,7 +615,8 @@ async def update_laundry_order(
             elif update_data["status"] == "cancelled":
                 update_data["cancelled_at"] = now
         
-        response = supabase.table("laundry_orders").update(update_data).eq("id", order_id).execute()
+        # update() sends Prefer: return=representation, so the updated row comes back here
+        response = await asyncio.to_thread(supabase.table("laundry_orders").update(update_data).eq("id", order_id).execute)
         
         if not response.data:
             raise HTTPException(
@@ -671,7 +624,14 @@ async def update_laundry_order(
                 detail="Laundry order not found"
             )
         
-        return await get_laundry_order(order_id, current_user)
+        # Only order columns change here; vendor, user and items come from the read above
+        return {
+            **response.data[0],
+            "items": [_order_item_response(item) for item in current_order["laundry_order_items"]],
+            "vendor_business_name": current_order["laundry_vendors"]["business_name"],
+            "user_name": f"{current_order['users']['first_name']} {current_order['users']['last_name']}",
+            "user_phone": current_order["users"]["phone"]
+        }
         
     except HTTPException:
         raise
@@ -690,18 +650,16 @@ async def process_laundry_payment(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Process payment for a laundry order (dummy implementation)"""
-    supabase = get_supabase_client()
-    
     try:
         # Get order
-        order_response = supabase.table("laundry_orders").select("*").eq("id", order_id).execute()
-        if not order_response.data:
+        order_response = await asyncio.to_thread(supabase.table("laundry_orders").select("user_id").eq("id", order_id).maybe_single().execute)
+        if order_response is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Laundry order not found"
             )
         
-        order = order_response.data[0]
+        order = order_response.data
         
         # Check permission
         if current_user.role == "user" and order["user_id"] != current_user.id:
@@ -720,7 +678,7 @@ async def process_laundry_payment(
             "payment_reference": payment_reference
         }
         
-        supabase.table("laundry_orders").update(update_data).eq("id", order_id).execute()
+        await asyncio.to_thread(supabase.table("laundry_orders").update(update_data).eq("id", order_id).execute)
         
         return LaundryPaymentResponse(
             success=True,
@@ -744,53 +702,21 @@ async def get_vendor_dashboard(
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
     """Get dashboard data for a laundry vendor"""
-    supabase = get_supabase_client()
-    
     # Verify vendor ownership
     if current_user.role not in ["master"]:
-        vendor_check = supabase.table("laundry_vendors").select("vendor_id").eq("id", vendor_id).execute()
-        if not vendor_check.data:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor not found")
-        
-        user_vendor_check = supabase.table("vendors").select("admin_id").eq("id", vendor_check.data[0]["vendor_id"]).execute()
-        if not user_vendor_check.data or user_vendor_check.data[0]["admin_id"] != current_user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        await _assert_vendor_owner(vendor_id, current_user)
     
     try:
-        # Get order statistics
-        orders_response = supabase.table("laundry_orders").select("status, total_amount, created_at").eq("laundry_vendor_id", vendor_id).execute()
-        
-        total_orders = len(orders_response.data)
-        pending_orders = len([o for o in orders_response.data if o["status"] == "pending"])
-        confirmed_orders = len([o for o in orders_response.data if o["status"] == "confirmed"])
-        in_process_orders = len([o for o in orders_response.data if o["status"] == "in_process"])
-        ready_orders = len([o for o in orders_response.data if o["status"] == "ready"])
-        delivered_orders = len([o for o in orders_response.data if o["status"] == "delivered"])
-        cancelled_orders = len([o for o in orders_response.data if o["status"] == "cancelled"])
-        
-        # Calculate revenue
-        today = datetime.now().date()
-        today_revenue = sum(
-            Decimal(str(o["total_amount"])) for o in orders_response.data 
-            if o["status"] == "delivered" and datetime.fromisoformat(o["created_at"].replace('Z', '+00:00')).date() == today
-        )
-        
-        this_month = today.replace(day=1)
-        monthly_revenue = sum(
-            Decimal(str(o["total_amount"])) for o in orders_response.data 
-            if o["status"] == "delivered" and datetime.fromisoformat(o["created_at"].replace('Z', '+00:00')).date() >= this_month
+        # Counts and revenue are aggregated in the database
+        # (see database/laundry_vendor_stats.sql); recent orders are independent
+        stats_response, recent_orders_response = await asyncio.gather(
+            asyncio.to_thread(supabase.rpc("get_laundry_vendor_stats", {"p_vendor_id": vendor_id}).execute),
+            asyncio.to_thread(supabase.table("laundry_orders").select(f"""
+                {LAUNDRY_ORDER_COLUMNS},
+                users!inner(first_name, last_name, phone)
+            """).eq("laundry_vendor_id", vendor_id).order("created_at", desc=True).limit(5).execute)
         )
         
-        # Get active items count
-        items_response = supabase.table("laundry_items").select("id").eq("laundry_vendor_id", vendor_id).eq("is_available", True).execute()
-        active_items = len(items_response.data)
-        
-        # Get recent orders
-        recent_orders_response = supabase.table("laundry_orders").select("""
-            *,
-            users!inner(first_name, last_name, phone)
-        """).eq("laundry_vendor_id", vendor_id).order("created_at", desc=True).limit(5).execute()
-        
         recent_orders = []
         for order in recent_orders_response.data:
             recent_orders.append({
@@ -801,23 +727,12 @@ async def get_vendor_dashboard(
                 "user_phone": order["users"]["phone"]
             })
         
-        stats = LaundryVendorStats(
-            total_orders=total_orders,
-            pending_orders=pending_orders,
-            confirmed_orders=confirmed_orders,
-            in_process_orders=in_process_orders,
-            ready_orders=ready_orders,
-            delivered_orders=delivered_orders,
-            cancelled_orders=cancelled_orders,
-            today_revenue=float(today_revenue),
-            monthly_revenue=float(monthly_revenue),
-            active_items=active_items
-        )
-        
-        return LaundryVendorDashboard(
-            stats=stats,
-            recent_orders=[LaundryOrderResponse(**order) for order in recent_orders]
-        )
+        # Validate once and write JSON bytes directly, skipping FastAPI's response_model pass
+        dashboard = LAUNDRY_VENDOR_DASHBOARD_ADAPTER.validate_python({
+            "stats": stats_response.data[0],
+            "recent_orders": recent_orders
+        })
+        return Response(content=LAUNDRY_VENDOR_DASHBOARD_ADAPTER.dump_json(dashboard), media_type="application/json")
         
     except HTTPException:
         raise
@@ -836,33 +751,38 @@ async def get_user_dashboard(current_user: UserResponse = Depends(get_current_us
             detail="Only users can access user dashboard"
         )
     
-    supabase = get_supabase_client()
-    
     try:
-        # Get user orders
-        orders_response = supabase.table("laundry_orders").select("""
-            *,
-            laundry_vendors!inner(business_name)
-        """).eq("user_id", current_user.id).execute()
+        # The tallies only need a few columns per order; full rows are fetched
+        # for the five most recent orders only
+        orders_response, recent_orders_response = await asyncio.gather(
+            asyncio.to_thread(supabase.table("laundry_orders").select(
+                "status, total_amount, laundry_vendors!inner(business_name)"
+            ).eq("user_id", current_user.id).execute),
+            asyncio.to_thread(supabase.table("laundry_orders").select(f"""
+                {LAUNDRY_ORDER_COLUMNS},
+                laundry_vendors!inner(business_name)
+            """).eq("user_id", current_user.id).order("created_at", desc=True).limit(5).execute)
+        )
         
+        # Tally open/delivered orders, spend and per-vendor counts in one pass
         total_orders = len(orders_response.data)
-        pending_orders = len([o for o in orders_response.data if o["status"] in ["pending", "confirmed", "picked_up", "in_process"]])
-        delivered_orders = len([o for o in orders_response.data if o["status"] == "delivered"])
-        total_spent = sum(Decimal(str(o["total_amount"])) for o in orders_response.data if o["status"] == "delivered")
-        
-        # Find favorite vendor
-        vendor_counts = {}
+        pending_orders = 0
+        delivered_orders = 0
+        total_spent = 0.0
+        vendor_counts = defaultdict(int)
         for order in orders_response.data:
-            vendor_name = order["laundry_vendors"]["business_name"]
-            vendor_counts[vendor_name] = vendor_counts.get(vendor_name, 0) + 1
-        
+            if order["status"] in OPEN_ORDER_STATUSES:
+                pending_orders += 1
+            elif order["status"] == "delivered":
+                delivered_orders += 1
+                total_spent += order["total_amount"]
+            vendor_counts[order["laundry_vendors"]["business_name"]] += 1
+        
+        # max() keeps the first of tied vendors in insertion order, i.e. the one ordered from first
         favorite_vendor = max(vendor_counts.items(), key=lambda x: x[1])[0] if vendor_counts else None
         
-        # Get recent orders
-        recent_orders = sorted(orders_response.data, key=lambda x: x["created_at"], reverse=True)[:5]
         recent_orders_formatted = []
-        
-        for order in recent_orders:
+        for order in recent_orders_response.data:
             recent_orders_formatted.append({
                 **order,
                 "items": [],  # Simplified for dashboard
@@ -871,14 +791,16 @@ async def get_user_dashboard(current_user: UserResponse = Depends(get_current_us
                 "user_phone": current_user.phone
             })
         
-        return LaundryUserStats(
-            total_orders=total_orders,
-            pending_orders=pending_orders,
-            delivered_orders=delivered_orders,
-            total_spent=total_spent,
-            favorite_vendor=favorite_vendor,
-            recent_orders=[LaundryOrderResponse(**order) for order in recent_orders_formatted]
-        )
+        # Validate once and write JSON bytes directly, skipping FastAPI's response_model pass
+        user_stats = LAUNDRY_USER_STATS_ADAPTER.validate_python({
+            "total_orders": total_orders,
+            "pending_orders": pending_orders,
+            "delivered_orders": delivered_orders,
+            "total_spent": round(total_spent, 2),  # drop float summation noise
+            "favorite_vendor": favorite_vendor,
+            "recent_orders": recent_orders_formatted
+        })
+        return Response(content=LAUNDRY_USER_STATS_ADAPTER.dump_json(user_stats), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 from app.models import OrderCreate, OrderResponse, UserResponse, OrderStatus
-from app.auth import get_current_user, require_role
-from app.database import get_supabase_client
+from app.auth import get_current_user, require_role, TokenUser
+from app.database import get_supabase_client, newest_first
+from postgrest.exceptions import APIError
+
+supabase = get_supabase_client()
+
+# SQLSTATE raised by database functions for missing rows
+NOT_FOUND_ERROR = "P0002"
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -11,8 +19,6 @@ async def create_order(
     order: OrderCreate,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     order_data = {
         "user_id": current_user.id,
         "vendor_id": order.vendor_id,
@@ -37,31 +43,21 @@ async def create_order(
         created_order = order_response.data[0]
         order_id = created_order["id"]
         
-        # Create order items
-        for item in order.items:
-            item_data = {
+        # Create all order items in one bulk insert
+        items_data = [
+            {
                 "order_id": order_id,
                 "product_id": item["product_id"],
                 "quantity": item["quantity"],
                 "unit_price": item["unit_price"],
                 "total_price": item["quantity"] * item["unit_price"]
             }
-            supabase.table("order_items").insert(item_data).execute()
+            for item in order.items
+        ]
+        if items_data:
+            supabase.table("order_items").insert(items_data).execute()
         
-        return OrderResponse(
-            id=created_order["id"],
-            user_id=created_order["user_id"],
-            vendor_id=created_order["vendor_id"],
-            partner_id=created_order.get("partner_id"),
-            total_amount=created_order["total_amount"],
-            status=created_order["status"],
-            delivery_address=created_order.get("delivery_address"),
-            delivery_date=created_order.get("delivery_date"),
-            delivery_time=created_order.get("delivery_time"),
-            special_instructions=created_order.get("special_instructions"),
-            created_at=created_order["created_at"],
-            updated_at=created_order["updated_at"]
-        )
+        return created_order
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -70,72 +66,53 @@ async def create_order(
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_orders(
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; omit to get every order"),
+    before: Optional[datetime] = Query(None, description="created_at of the last order on the previous page"),
+    before_id: Optional[UUID] = Query(None, description="id of the last order on the previous page"),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     # Users see their own orders, admins see orders for their vendor
     if current_user.role == "user":
-        response = supabase.table("orders").select("*").eq("user_id", current_user.id).execute()
+        response = newest_first(supabase.table("orders").select("*").eq("user_id", current_user.id), limit, before, before_id).execute()
     elif current_user.role in ["admin", "partner"]:
-        # Get vendor for admin/partner
-        vendor_response = supabase.table("vendors").select("*").eq("admin_id", current_user.id).execute()
-        if vendor_response.data:
-            vendor_id = vendor_response.data[0]["id"]
-            response = supabase.table("orders").select("*").eq("vendor_id", vendor_id).execute()
+        # Vendor admins see their vendors' orders, everyone else their partner orders;
+        # the branch depends on ownership, not on whether this page is empty
+        owns_vendor = supabase.table("vendors").select("id", count="exact", head=True).eq("admin_id", current_user.id).execute()
+        if owns_vendor.count:
+            response = newest_first(supabase.table("orders").select("*, vendors!inner(admin_id)").eq("vendors.admin_id", current_user.id), limit, before, before_id).execute()
         else:
-            response = supabase.table("orders").select("*").eq("partner_id", current_user.id).execute()
+            response = newest_first(supabase.table("orders").select("*").eq("partner_id", current_user.id), limit, before, before_id).execute()
     else:
         # Master sees all orders
-        response = supabase.table("orders").select("*").execute()
+        response = newest_first(supabase.table("orders").select("*"), limit, before, before_id).execute()
     
-    orders = []
-    for order_data in response.data:
-        orders.append(OrderResponse(
-            id=order_data["id"],
-            user_id=order_data["user_id"],
-            vendor_id=order_data["vendor_id"],
-            partner_id=order_data.get("partner_id"),
-            total_amount=order_data["total_amount"],
-            status=order_data["status"],
-            delivery_address=order_data.get("delivery_address"),
-            delivery_date=order_data.get("delivery_date"),
-            delivery_time=order_data.get("delivery_time"),
-            special_instructions=order_data.get("special_instructions"),
-            created_at=order_data["created_at"],
-            updated_at=order_data["updated_at"]
-        ))
-    
-    return orders
+    return response.data
 
 @router.put("/{order_id}/status")
 async def update_order_status(
     order_id: str,
     new_status: OrderStatus,
-    current_user: UserResponse = Depends(require_role(["admin", "partner", "master"]))
+    current_user: TokenUser = Depends(require_role(["admin", "partner", "master"]))
 ):
-    supabase = get_supabase_client()
-    
     try:
-        # Update order status
-        response = supabase.table("orders").update({
-            "status": new_status.value
-        }).eq("id", order_id).execute()
+        # Update and history row are written together; see database/update_order_status.sql
+        supabase.rpc("update_order_status", {
+            "p_order_id": order_id,
+            "p_status": new_status.value,
+            "p_changed_by": current_user.id
+        }).execute()
         
-        if not response.data:
+        return {"message": "Order status updated successfully"}
+    except APIError as e:
+        if e.code == NOT_FOUND_ERROR:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Order not found"
             )
-        
-        # Log status change
-        supabase.table("order_status_history").insert({
-            "order_id": order_id,
-            "status": new_status.value,
-            "changed_by": current_user.id
-        }).execute()
-        
-        return {"message": "Order status updated successfully"}
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to update order status: {e.message}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -147,8 +124,6 @@ async def get_order(
     order_id: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     response = supabase.table("orders").select("*").eq("id", order_id).execute()
     if not response.data:
         raise HTTPException(
@@ -165,17 +140,4 @@ async def get_order(
             detail="Not authorized to view this order"
         )
     
-    return OrderResponse(
-        id=order_data["id"],
-        user_id=order_data["user_id"],
-        vendor_id=order_data["vendor_id"],
-        partner_id=order_data.get("partner_id"),
-        total_amount=order_data["total_amount"],
-        status=order_data["status"],
-        delivery_address=order_data.get("delivery_address"),
-        delivery_date=order_data.get("delivery_date"),
-        delivery_time=order_data.get("delivery_time"),
-        special_instructions=order_data.get("special_instructions"),
-        created_at=order_data["created_at"],
-        updated_at=order_data["updated_at"]
-    )
\ No newline at end of file
+    return order_data
\ No newline at end of file
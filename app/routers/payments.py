@@ -1,76 +1,56 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from app.models import PaymentCreate, PaymentResponse, UserResponse, PaymentStatus
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from datetime import datetime
+from typing import List, Optional
+from app.models import PaymentCreate, PaymentResponse, UserResponse
 from app.auth import get_current_user
-from app.database import get_supabase_client
+from app.database import get_supabase_client, newest_first
+from postgrest.exceptions import APIError
 import uuid
 
+supabase = get_supabase_client()
+
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+# SQLSTATEs raised by database/payment_functions.sql, mapped to HTTP statuses
+ERROR_STATUS = {
+    "P0002": status.HTTP_404_NOT_FOUND,
+    "42501": status.HTTP_403_FORBIDDEN,
+    "P0001": status.HTTP_400_BAD_REQUEST
+}
+
 @router.post("/", response_model=PaymentResponse)
 async def create_payment(
     payment: PaymentCreate,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
-    # Verify order exists and belongs to user
-    order_response = supabase.table("orders").select("*").eq("id", payment.order_id).execute()
-    if not order_response.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    order = order_response.data[0]
-    if order["user_id"] != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to create payment for this order"
-        )
-    
     # Generate mock transaction ID
     transaction_id = f"TX_{uuid.uuid4().hex[:8].upper()}"
     
-    payment_data = {
-        "order_id": payment.order_id,
-        "user_id": current_user.id,
-        "amount": payment.amount,
-        "payment_method": payment.payment_method or "mock_payment",
-        "status": PaymentStatus.PENDING.value,
-        "transaction_id": transaction_id
-    }
-    
     try:
-        response = supabase.table("payments").insert(payment_data).execute()
+        # Ownership check, payment insert and order confirmation run in one
+        # transaction; see database/payment_functions.sql
+        response = supabase.rpc("create_and_confirm_payment", {
+            "p_order_id": payment.order_id,
+            "p_user_id": current_user.id,
+            "p_amount": payment.amount,
+            "p_payment_method": payment.payment_method or "mock_payment",
+            "p_transaction_id": transaction_id
+        }).execute()
         if not response.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to create payment"
             )
         
-        created_payment = response.data[0]
+        created_payment = response.data
         
-        # Mock payment processing - automatically mark as paid for demo
-        supabase.table("payments").update({
-            "status": PaymentStatus.PAID.value
-        }).eq("id", created_payment["id"]).execute()
-        
-        # Update order status to confirmed
-        supabase.table("orders").update({
-            "status": "confirmed"
-        }).eq("id", payment.order_id).execute()
-        
-        return PaymentResponse(
-            id=created_payment["id"],
-            order_id=created_payment["order_id"],
-            user_id=created_payment["user_id"],
-            amount=created_payment["amount"],
-            payment_method=created_payment.get("payment_method"),
-            status=PaymentStatus.PAID.value,  # Mock as paid
-            transaction_id=created_payment.get("transaction_id"),
-            created_at=created_payment["created_at"],
-            updated_at=created_payment["updated_at"]
+        return created_payment
+    except HTTPException:
+        raise
+    except APIError as e:
+        raise HTTPException(
+            status_code=ERROR_STATUS.get(e.code, status.HTTP_400_BAD_REQUEST),
+            detail=e.message if e.code in ERROR_STATUS else f"Failed to create payment: {e.message}"
         )
     except Exception as e:
         raise HTTPException(
@@ -80,40 +60,25 @@ async def create_payment(
 
 @router.get("/", response_model=List[PaymentResponse])
 async def get_payments(
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; omit to get every payment"),
+    before: Optional[datetime] = Query(None, description="created_at of the last payment on the previous page"),
+    before_id: Optional[uuid.UUID] = Query(None, description="id of the last payment on the previous page"),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     # Users see their own payments, admins see payments for their vendor orders
     if current_user.role == "user":
-        response = supabase.table("payments").select("*").eq("user_id", current_user.id).execute()
+        response = newest_first(supabase.table("payments").select("*").eq("user_id", current_user.id), limit, before, before_id).execute()
     else:
         # For admins/masters, get all payments (could be filtered by vendor/community)
-        response = supabase.table("payments").select("*").execute()
+        response = newest_first(supabase.table("payments").select("*"), limit, before, before_id).execute()
     
-    payments = []
-    for payment_data in response.data:
-        payments.append(PaymentResponse(
-            id=payment_data["id"],
-            order_id=payment_data["order_id"],
-            user_id=payment_data["user_id"],
-            amount=payment_data["amount"],
-            payment_method=payment_data.get("payment_method"),
-            status=payment_data["status"],
-            transaction_id=payment_data.get("transaction_id"),
-            created_at=payment_data["created_at"],
-            updated_at=payment_data["updated_at"]
-        ))
-    
-    return payments
+    return response.data
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
 async def get_payment(
     payment_id: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     response = supabase.table("payments").select("*").eq("id", payment_id).execute()
     if not response.data:
         raise HTTPException(
@@ -130,53 +95,23 @@ async def get_payment(
             detail="Not authorized to view this payment"
         )
     
-    return PaymentResponse(
-        id=payment_data["id"],
-        order_id=payment_data["order_id"],
-        user_id=payment_data["user_id"],
-        amount=payment_data["amount"],
-        payment_method=payment_data.get("payment_method"),
-        status=payment_data["status"],
-        transaction_id=payment_data.get("transaction_id"),
-        created_at=payment_data["created_at"],
-        updated_at=payment_data["updated_at"]
-    )
+    return payment_data
 
 @router.post("/{payment_id}/refund")
 async def refund_payment(
     payment_id: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
-    # Check if payment exists
-    payment_response = supabase.table("payments").select("*").eq("id", payment_id).execute()
-    if not payment_response.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Payment not found"
-        )
-    
-    payment = payment_response.data[0]
-    
-    if payment["status"] != PaymentStatus.PAID.value:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Can only refund paid payments"
-        )
-    
     try:
-        # Update payment status to refunded
-        supabase.table("payments").update({
-            "status": PaymentStatus.REFUNDED.value
-        }).eq("id", payment_id).execute()
-        
-        # Update related order status to cancelled
-        supabase.table("orders").update({
-            "status": "cancelled"
-        }).eq("id", payment["order_id"]).execute()
+        # Status check, refund and order cancellation run in one transaction
+        response = supabase.rpc("refund_payment", {"p_payment_id": payment_id}).execute()
         
-        return {"message": "Payment refunded successfully", "transaction_id": payment["transaction_id"]}
+        return {"message": "Payment refunded successfully", "transaction_id": response.data["transaction_id"]}
+    except APIError as e:
+        raise HTTPException(
+            status_code=ERROR_STATUS.get(e.code, status.HTTP_400_BAD_REQUEST),
+            detail=e.message if e.code in ERROR_STATUS else f"Failed to refund payment: {e.message}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
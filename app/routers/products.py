@@ -1,22 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List
-from app.models import ProductCreate, ProductResponse, UserResponse
-from app.auth import get_current_user, require_role
+from cachetools import TTLCache
+from app.models import ProductCreate, ProductResponse, UserResponse, PRODUCT_LIST_ADAPTER
+from app.auth import get_current_user, require_role, TokenUser
 from app.database import get_supabase_client
+from app.caching import cache_listing, etag_response
+
+supabase = get_supabase_client()
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# vendor_id -> (ETag, JSON body) of the available-products list; dropped on product writes
+_vendor_products_cache = TTLCache(maxsize=1024, ttl=60)
+
 @router.post("/", response_model=ProductResponse)
 async def create_product(
     product: ProductCreate,
-    current_user: UserResponse = Depends(require_role(["admin", "master"]))
+    current_user: TokenUser = Depends(require_role(["admin", "master"]))
 ):
-    supabase = get_supabase_client()
-    
     # Check if user is admin of the vendor
     if current_user.role == "admin":
-        vendor_check = supabase.table("vendors").select("*").eq("id", product.vendor_id).eq("admin_id", current_user.id).execute()
-        if not vendor_check.data:
+        vendor_check = supabase.table("vendors").select("id", count="exact", head=True).eq("id", product.vendor_id).eq("admin_id", current_user.id).execute()
+        if not vendor_check.count:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to create products for this vendor"
@@ -40,20 +45,9 @@ async def create_product(
                 detail="Failed to create product"
             )
         
+        _vendor_products_cache.pop(product.vendor_id, None)
         created_product = response.data[0]
-        return ProductResponse(
-            id=created_product["id"],
-            vendor_id=created_product["vendor_id"],
-            category_id=created_product.get("category_id"),
-            name=created_product["name"],
-            description=created_product.get("description"),
-            price=created_product["price"],
-            unit=created_product.get("unit"),
-            image_url=created_product.get("image_url"),
-            is_available=created_product["is_available"],
-            created_at=created_product["created_at"],
-            updated_at=created_product["updated_at"]
-        )
+        return created_product
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,37 +57,22 @@ async def create_product(
 @router.get("/vendor/{vendor_id}", response_model=List[ProductResponse])
 async def get_products_by_vendor(
     vendor_id: str,
+    request: Request,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
-    response = supabase.table("products").select("*").eq("vendor_id", vendor_id).eq("is_available", True).execute()
+    cached = _vendor_products_cache.get(vendor_id)
+    if cached is None:
+        response = supabase.table("products").select("*").eq("vendor_id", vendor_id).eq("is_available", True).execute()
+        body = PRODUCT_LIST_ADAPTER.dump_json(PRODUCT_LIST_ADAPTER.validate_python(response.data))
+        cached = cache_listing(_vendor_products_cache, vendor_id, body)
     
-    products = []
-    for product_data in response.data:
-        products.append(ProductResponse(
-            id=product_data["id"],
-            vendor_id=product_data["vendor_id"],
-            category_id=product_data.get("category_id"),
-            name=product_data["name"],
-            description=product_data.get("description"),
-            price=product_data["price"],
-            unit=product_data.get("unit"),
-            image_url=product_data.get("image_url"),
-            is_available=product_data["is_available"],
-            created_at=product_data["created_at"],
-            updated_at=product_data["updated_at"]
-        ))
-    
-    return products
+    return etag_response(request, cached)
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
-    
     response = supabase.table("products").select("*").eq("id", product_id).execute()
     if not response.data:
         raise HTTPException(
@@ -103,32 +82,18 @@ async def get_product(
     
     product_data = response.data[0]
     
-    return ProductResponse(
-        id=product_data["id"],
-        vendor_id=product_data["vendor_id"],
-        category_id=product_data.get("category_id"),
-        name=product_data["name"],
-        description=product_data.get("description"),
-        price=product_data["price"],
-        unit=product_data.get("unit"),
-        image_url=product_data.get("image_url"),
-        is_available=product_data["is_available"],
-        created_at=product_data["created_at"],
-        updated_at=product_data["updated_at"]
-    )
+    return product_data
 
 @router.put("/{product_id}")
 async def update_product(
     product_id: str,
     product: ProductCreate,
-    current_user: UserResponse = Depends(require_role(["admin", "master"]))
+    current_user: TokenUser = Depends(require_role(["admin", "master"]))
 ):
-    supabase = get_supabase_client()
-    
     # Check if user is admin of the vendor
     if current_user.role == "admin":
-        vendor_check = supabase.table("vendors").select("*").eq("id", product.vendor_id).eq("admin_id", current_user.id).execute()
-        if not vendor_check.data:
+        vendor_check = supabase.table("vendors").select("id", count="exact", head=True).eq("id", product.vendor_id).eq("admin_id", current_user.id).execute()
+        if not vendor_check.count:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to update products for this vendor"
@@ -150,6 +115,7 @@ async def update_product(
                 detail="Product not found"
             )
         
+        _vendor_products_cache.pop(response.data[0]["vendor_id"], None)
         return {"message": "Product updated successfully"}
     except Exception as e:
         raise HTTPException(
@@ -160,10 +126,8 @@ async def update_product(
 @router.delete("/{product_id}")
 async def delete_product(
     product_id: str,
-    current_user: UserResponse = Depends(require_role(["admin", "master"]))
+    current_user: TokenUser = Depends(require_role(["admin", "master"]))
 ):
-    supabase = get_supabase_client()
-    
     try:
         # Soft delete by setting is_available to False
         response = supabase.table("products").update({"is_available": False}).eq("id", product_id).execute()
@@ -173,6 +137,7 @@ async def delete_product(
                 detail="Product not found"
             )
         
+        _vendor_products_cache.pop(response.data[0]["vendor_id"], None)
         return {"message": "Product deleted successfully"}
     except Exception as e:
         raise HTTPException(
@@ -1,13 +1,49 @@
+import asyncio
+import orjson
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException, status, Depends, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 from datetime import datetime
-from app.models import VendorCreate, VendorResponse, UserResponse
-from app.auth import get_current_user, require_role, get_password_hash, verify_token
-from app.database import get_supabase_client
+from app.models import VendorCreate, VendorResponse, UserResponse, VENDOR_LIST_ADAPTER
+from app.auth import get_current_user, require_role, aget_password_hash, TokenUser
+from app.database import get_supabase_client, ilike_pattern
+from app.caching import cache_listing, etag_response
+from postgrest.exceptions import APIError
+
+supabase = get_supabase_client()
+
+# Columns read by VendorResponse and by the listing endpoints respectively
+VENDOR_COLUMNS = "id,name,type,community_id,admin_id,description,operating_hours,is_active,created_at,updated_at"
+VENDOR_LISTING_COLUMNS = "id,name,type,address,community_id,description,is_active,created_at,updated_at"
+
+# SQLSTATE raised by database functions for rejected input
+BAD_REQUEST_ERROR = "P0001"
+
+# Every new vendor login starts with this password; hashed once per process
+DEFAULT_VENDOR_PASSWORD = "test"
+_default_password_hash: Optional[str] = None
 
 router = APIRouter(prefix="/vendors", tags=["vendors"])
 
+# Listing key -> (ETag, JSON body) for the vendor list/stats endpoints; cleared on vendor writes
+_vendor_lists_cache = TTLCache(maxsize=1024, ttl=30)
+
+async def _community_names(supabase, vendors: List[dict]) -> dict:
+    """Map community id -> name for the given vendor rows in a single IN query"""
+    ids = list({v["community_id"] for v in vendors if v.get("community_id")})
+    if not ids:
+        return {}
+    response = await asyncio.to_thread(supabase.table("communities").select("id, name").in_("id", ids).execute)
+    return {row["id"]: row["name"] for row in response.data}
+
+async def _get_default_password_hash() -> str:
+    """bcrypt hash of DEFAULT_VENDOR_PASSWORD, computed on first use"""
+    global _default_password_hash
+    if _default_password_hash is None:
+        _default_password_hash = await aget_password_hash(DEFAULT_VENDOR_PASSWORD)
+    return _default_password_hash
+
 def get_current_user_or_testing(
     request: Request,
     x_testing: Optional[str] = Header(None)
@@ -44,95 +80,38 @@ async def create_vendor(
     vendor: VendorCreate,
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
-    supabase = get_supabase_client()
-    
     try:
-        # Use the provided contact_email for vendor login account
-        vendor_email = vendor.contact_email
-        hashed_password = get_password_hash("test")
-        
-        # Check if email already exists
-        existing_user = supabase.table("users").select("*").eq("email", vendor_email).execute()
-        if existing_user.data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"A user with email {vendor_email} already exists"
-            )
-        
-        # Create user account for vendor
-        user_data = {
-            "email": vendor_email,
-            "password_hash": hashed_password,
-            "first_name": vendor.name.split()[0],
-            "last_name": vendor.name.split()[-1] if len(vendor.name.split()) > 1 else "Vendor",
-            "role": "vendor",
-            "community_id": vendor.community_id,
-            "is_active": True
-        }
-        
-        user_response = supabase.table("users").insert(user_data).execute()
-        if not user_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to create vendor user account"
-            )
-        
-        created_user = user_response.data[0]
+        hashed_password = await _get_default_password_hash()
+        name_parts = vendor.name.split()
         
-        # Now create the vendor record with the created user as admin
-        vendor_data = {
-            "name": vendor.name,
-            "type": vendor.type,
-            "community_id": vendor.community_id,
-            "admin_id": created_user["id"],  # Link vendor to the auto-created user
-            "contact_email": vendor_email,  # Store the email used for login
-            "contact_phone": vendor.contact_phone,
-            "address": vendor.address,
-            "description": vendor.description,
-            "operating_hours": vendor.operating_hours
-        }
-        
-        response = supabase.table("vendors").insert(vendor_data).execute()
-        if not response.data:
-            # If vendor creation fails, clean up the user account
-            supabase.table("users").delete().eq("id", created_user["id"]).execute()
+        # Login user, vendor and laundry profile are created in one transaction;
+        # see database/create_vendor_with_user.sql
+        try:
+            response = await asyncio.to_thread(supabase.rpc("create_vendor_with_user", {
+                "p_name": vendor.name,
+                "p_type": vendor.type,
+                "p_community_id": vendor.community_id,
+                "p_contact_email": vendor.contact_email,  # Also the vendor's login email
+                "p_contact_phone": vendor.contact_phone,
+                "p_address": vendor.address,
+                "p_description": vendor.description,
+                "p_operating_hours": vendor.operating_hours,
+                "p_first_name": name_parts[0],
+                "p_last_name": name_parts[-1] if len(name_parts) > 1 else "Vendor",
+                "p_password_hash": hashed_password
+            }).execute)
+        except APIError as e:
+            if e.code != BAD_REQUEST_ERROR:
+                raise
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to create vendor"
+                detail=e.message
             )
         
-        created_vendor = response.data[0]
-        
-        # If vendor type is laundry, create a laundry vendor profile
-        if vendor.type == "laundry":
-            laundry_vendor_data = {
-                "vendor_id": created_vendor["id"],
-                "business_name": vendor.name,
-                "description": vendor.description or f"Professional laundry services by {vendor.name}",
-                "pickup_time_start": "08:00:00",
-                "pickup_time_end": "18:00:00",
-                "delivery_time_hours": 24,
-                "minimum_order_amount": 100.00,
-                "pickup_charge": 20.00,
-                "delivery_charge": 30.00,
-                "service_areas": []
-            }
-            
-            supabase.table("laundry_vendors").insert(laundry_vendor_data).execute()
-            # Note: No default items are created - vendors need to add their own items
-        
-        return VendorResponse(
-            id=created_vendor["id"],
-            name=created_vendor["name"],
-            type=created_vendor["type"],
-            community_id=created_vendor["community_id"],
-            admin_id=created_vendor.get("admin_id"),
-            description=created_vendor.get("description"),
-            operating_hours=created_vendor.get("operating_hours"),
-            is_active=created_vendor["is_active"],
-            created_at=created_vendor["created_at"],
-            updated_at=created_vendor["updated_at"]
-        )
+        _vendor_lists_cache.clear()
+        return response.data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -141,57 +120,46 @@ async def create_vendor(
 
 @router.get("/", response_model=List[VendorResponse])
 async def get_vendors(
+    request: Request,
     current_user: UserResponse = Depends(get_current_user_or_testing)
 ):
-    supabase = get_supabase_client()
-    
     # Filter vendors based on user role and community
-    if current_user.role == "master":
-        response = supabase.table("vendors").select("*").execute()
-    else:
-        if not current_user.community_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User not associated with any community"
-            )
-        response = supabase.table("vendors").select("*").eq("community_id", current_user.community_id).execute()
+    if current_user.role != "master" and not current_user.community_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User not associated with any community"
+        )
     
-    vendors = []
-    for vendor_data in response.data:
-        vendors.append(VendorResponse(
-            id=vendor_data["id"],
-            name=vendor_data["name"],
-            type=vendor_data["type"],
-            community_id=vendor_data["community_id"],
-            admin_id=vendor_data.get("admin_id"),
-            description=vendor_data.get("description"),
-            operating_hours=vendor_data.get("operating_hours"),
-            is_active=vendor_data["is_active"],
-            created_at=vendor_data["created_at"],
-            updated_at=vendor_data["updated_at"]
-        ))
+    key = ("list", None if current_user.role == "master" else current_user.community_id)
+    cached = _vendor_lists_cache.get(key)
+    if cached is None:
+        query = supabase.table("vendors").select(VENDOR_COLUMNS)
+        if current_user.role != "master":
+            query = query.eq("community_id", current_user.community_id)
+        response = await asyncio.to_thread(query.execute)
+        body = VENDOR_LIST_ADAPTER.dump_json(VENDOR_LIST_ADAPTER.validate_python(response.data))
+        cached = cache_listing(_vendor_lists_cache, key, body)
     
-    return vendors
+    return etag_response(request, cached)
 
 @router.get("/stats")
 async def get_vendor_stats(
+    request: Request,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get vendor statistics"""
-    supabase = get_supabase_client()
+    cached = _vendor_lists_cache.get(("stats",))
+    if cached is not None:
+        return etag_response(request, cached)
     
     try:
-        # Get vendors with basic stats
-        vendors_response = supabase.table("vendors").select("*").execute()
-        vendor_stats = []
+        # One pre-aggregated row per vendor; see database/vendor_stats_view.sql
+        response = await asyncio.to_thread(supabase.table("vendor_stats_v").select(
+            "id, name, type, is_active, order_count, revenue"
+        ).execute)
         
-        for vendor in vendors_response.data:
-            # Get order count and revenue for this vendor
-            orders_response = supabase.table("orders").select("*").eq("vendor_id", vendor["id"]).execute()
-            
-            total_orders = len(orders_response.data)
-            total_revenue = sum([order.get("total_amount", 0) for order in orders_response.data if order.get("status") == "completed"])
-            
+        vendor_stats = []
+        for vendor in response.data:
             # Calculate average rating (placeholder - would need ratings table)
             rating = 4.5  # Default rating
             
@@ -199,13 +167,13 @@ async def get_vendor_stats(
                 "vendorId": vendor["id"],
                 "vendorName": vendor["name"],
                 "vendorType": vendor["type"],
-                "orderCount": total_orders,
-                "revenue": total_revenue,
+                "orderCount": vendor["order_count"],
+                "revenue": float(vendor["revenue"]),
                 "rating": rating,
                 "isActive": vendor["is_active"]
             })
         
-        return vendor_stats
+        return etag_response(request, cache_listing(_vendor_lists_cache, ("stats",), orjson.dumps(vendor_stats)))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -219,42 +187,40 @@ async def search_vendors(
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Search vendors by name, with optional type filter"""
-    supabase = get_supabase_client()
-    
     try:
         # Build query based on search and filters
-        query = supabase.table("vendors").select("*")
+        query = supabase.table("vendors").select(VENDOR_LISTING_COLUMNS)
         
         if vendor_type:
             query = query.eq("type", vendor_type)
         
-        # Supabase doesn't have ILIKE, so we'll filter in Python
-        response = query.execute()
+        # Match the search term (if provided) in Postgres; see database/vendors_search_index.sql
+        if q:
+            pattern = ilike_pattern(q)
+            query = query.or_(f"name.ilike.{pattern},description.ilike.{pattern}")
+        
+        response = await asyncio.to_thread(query.execute)
+        
+        community_names = await _community_names(supabase, response.data)
         
         vendors = []
         for vendor_data in response.data:
-            # Filter by search term (if provided)
-            if not q or (q.lower() in vendor_data["name"].lower() or 
-                        q.lower() in vendor_data.get("description", "").lower()):
-                
-                # Get community name
-                community_response = supabase.table("communities").select("name").eq("id", vendor_data["community_id"]).execute()
-                community_name = community_response.data[0]["name"] if community_response.data else "Unknown"
-                
-                vendors.append({
-                    "id": vendor_data["id"],
-                    "name": vendor_data["name"],
-                    "type": vendor_data["type"],
-                    "email": vendor_data.get("email", ""),
-                    "phone": vendor_data.get("phone", ""),
-                    "address": vendor_data.get("address", ""),
-                    "community_id": vendor_data["community_id"],
-                    "community_name": community_name,
-                    "description": vendor_data.get("description", ""),
-                    "is_active": vendor_data["is_active"],
-                    "created_at": vendor_data["created_at"],
-                    "updated_at": vendor_data["updated_at"]
-                })
+            community_name = community_names.get(vendor_data["community_id"], "Unknown")
+            
+            vendors.append({
+                "id": vendor_data["id"],
+                "name": vendor_data["name"],
+                "type": vendor_data["type"],
+                "email": vendor_data.get("email", ""),
+                "phone": vendor_data.get("phone", ""),
+                "address": vendor_data.get("address", ""),
+                "community_id": vendor_data["community_id"],
+                "community_name": community_name,
+                "description": vendor_data.get("description", ""),
+                "is_active": vendor_data["is_active"],
+                "created_at": vendor_data["created_at"],
+                "updated_at": vendor_data["updated_at"]
+            })
         
         return vendors
     except Exception as e:
@@ -268,9 +234,14 @@ async def get_vendor(
     vendor_id: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase_client()
+    # Users outside any community can't see any vendor; no need to look it up
+    if current_user.role != "master" and not current_user.community_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this vendor"
+        )
     
-    response = supabase.table("vendors").select("*").eq("id", vendor_id).execute()
+    response = await asyncio.to_thread(supabase.table("vendors").select(VENDOR_COLUMNS).eq("id", vendor_id).execute)
     if not response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -287,36 +258,14 @@ async def get_vendor(
             detail="Not authorized to view this vendor"
         )
     
-    return VendorResponse(
-        id=vendor_data["id"],
-        name=vendor_data["name"],
-        type=vendor_data["type"],
-        community_id=vendor_data["community_id"],
-        admin_id=vendor_data.get("admin_id"),
-        description=vendor_data.get("description"),
-        operating_hours=vendor_data.get("operating_hours"),
-        is_active=vendor_data["is_active"],
-        created_at=vendor_data["created_at"],
-        updated_at=vendor_data["updated_at"]
-    )
+    return vendor_data
 
 @router.put("/{vendor_id}")
 async def update_vendor(
     vendor_id: str,
     vendor: VendorCreate,
-    current_user: UserResponse = Depends(require_role(["master", "admin"]))
+    current_user: TokenUser = Depends(require_role(["master", "admin"]))
 ):
-    supabase = get_supabase_client()
-    
-    # Check if user is admin of this vendor
-    if current_user.role == "admin":
-        vendor_check = supabase.table("vendors").select("*").eq("id", vendor_id).eq("admin_id", current_user.id).execute()
-        if not vendor_check.data:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this vendor"
-            )
-    
     vendor_data = {
         "name": vendor.name,
         "type": vendor.type,
@@ -325,30 +274,40 @@ async def update_vendor(
     }
     
     try:
-        response = supabase.table("vendors").update(vendor_data).eq("id", vendor_id).execute()
+        query = supabase.table("vendors").update(vendor_data).eq("id", vendor_id)
+        # Admins may only update their own vendor; checked by the UPDATE itself
+        if current_user.role == "admin":
+            query = query.eq("admin_id", current_user.id)
+        response = await asyncio.to_thread(query.execute)
         if not response.data:
+            if current_user.role == "admin":
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this vendor"
+                )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vendor not found"
             )
         
+        _vendor_lists_cache.clear()
         return {"message": "Vendor updated successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to update vendor: {str(e)}"
         )
 
-@router.patch("/{vendor_id}/status")
+@router.patch("/{vendor_id}/status", response_model=VendorResponse)
 async def toggle_vendor_status(
     vendor_id: str,
-    current_user: UserResponse = Depends(require_role(["master", "admin"]))
+    current_user: TokenUser = Depends(require_role(["master", "admin"]))
 ):
     """Toggle vendor active status"""
-    supabase = get_supabase_client()
-    
     # Get current vendor
-    vendor_response = supabase.table("vendors").select("*").eq("id", vendor_id).execute()
+    vendor_response = await asyncio.to_thread(supabase.table("vendors").select("is_active").eq("id", vendor_id).execute)
     if not vendor_response.data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -359,26 +318,15 @@ async def toggle_vendor_status(
     new_status = not vendor["is_active"]
     
     try:
-        response = supabase.table("vendors").update({"is_active": new_status}).eq("id", vendor_id).execute()
+        response = await asyncio.to_thread(supabase.table("vendors").update({"is_active": new_status}).eq("id", vendor_id).execute)
         if not response.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vendor not found"
             )
         
-        updated_vendor = response.data[0]
-        return VendorResponse(
-            id=updated_vendor["id"],
-            name=updated_vendor["name"],
-            type=updated_vendor["type"],
-            community_id=updated_vendor["community_id"],
-            admin_id=updated_vendor.get("admin_id"),
-            description=updated_vendor.get("description"),
-            operating_hours=updated_vendor.get("operating_hours"),
-            is_active=updated_vendor["is_active"],
-            created_at=updated_vendor["created_at"],
-            updated_at=updated_vendor["updated_at"]
-        )
+        _vendor_lists_cache.clear()
+        return response.data[0]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -388,20 +336,25 @@ async def toggle_vendor_status(
 @router.get("/community/{community_id}")
 async def get_vendors_by_community(
     community_id: str,
+    request: Request,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get all vendors in a specific community"""
-    supabase = get_supabase_client()
+    cached = _vendor_lists_cache.get(("community", community_id))
+    if cached is not None:
+        return etag_response(request, cached)
     
     try:
-        response = supabase.table("vendors").select("*").eq("community_id", community_id).execute()
+        # Every vendor here shares the same community, so look its name up once,
+        # alongside the vendors query
+        response, community_response = await asyncio.gather(
+            asyncio.to_thread(supabase.table("vendors").select(VENDOR_LISTING_COLUMNS).eq("community_id", community_id).execute),
+            asyncio.to_thread(supabase.table("communities").select("name").eq("id", community_id).execute)
+        )
+        community_name = community_response.data[0]["name"] if community_response.data else "Unknown"
         
         vendors = []
         for vendor_data in response.data:
-            # Get community name
-            community_response = supabase.table("communities").select("name").eq("id", community_id).execute()
-            community_name = community_response.data[0]["name"] if community_response.data else "Unknown"
-            
             # Transform to match frontend interface
             vendors.append({
                 "id": vendor_data["id"],
@@ -422,7 +375,7 @@ async def get_vendors_by_community(
                 "last_active": vendor_data["updated_at"]
             })
         
-        return vendors
+        return etag_response(request, cache_listing(_vendor_lists_cache, ("community", community_id), orjson.dumps(vendors)))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -432,19 +385,22 @@ async def get_vendors_by_community(
 @router.get("/type/{vendor_type}")
 async def get_vendors_by_type(
     vendor_type: str,
+    request: Request,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """Get all vendors of a specific type"""
-    supabase = get_supabase_client()
+    cached = _vendor_lists_cache.get(("type", vendor_type))
+    if cached is not None:
+        return etag_response(request, cached)
     
     try:
-        response = supabase.table("vendors").select("*").eq("type", vendor_type).execute()
+        response = await asyncio.to_thread(supabase.table("vendors").select(VENDOR_LISTING_COLUMNS).eq("type", vendor_type).execute)
+        
+        community_names = await _community_names(supabase, response.data)
         
         vendors = []
         for vendor_data in response.data:
-            # Get community name
-            community_response = supabase.table("communities").select("name").eq("id", vendor_data["community_id"]).execute()
-            community_name = community_response.data[0]["name"] if community_response.data else "Unknown"
+            community_name = community_names.get(vendor_data["community_id"], "Unknown")
             
             vendors.append({
                 "id": vendor_data["id"],
@@ -465,7 +421,7 @@ async def get_vendors_by_type(
                 "last_active": vendor_data["updated_at"]
             })
         
-        return vendors
+        return etag_response(request, cache_listing(_vendor_lists_cache, ("type", vendor_type), orjson.dumps(vendors)))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,7 @@
+-- Community join codes must be unique
+-- POST /api/communities generates a random COMxxxxxxxx code and relies on this
+-- constraint to reject the (rare) collision, retrying with a fresh code.
+-- Run this in your Supabase SQL Editor
+
+create unique index if not exists communities_code_key
+    on public.communities (code);
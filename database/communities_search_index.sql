@@ -0,0 +1,15 @@
+-- Trigram indexes backing GET /api/communities/search
+-- The endpoint filters with name/code/address ILIKE '%term%', which a plain
+-- b-tree index cannot serve; pg_trgm GIN indexes can.
+-- Run this in your Supabase SQL Editor
+
+create extension if not exists pg_trgm;
+
+create index if not exists communities_name_trgm_idx
+    on public.communities using gin (name gin_trgm_ops);
+
+create index if not exists communities_code_trgm_idx
+    on public.communities using gin (code gin_trgm_ops);
+
+create index if not exists communities_address_trgm_idx
+    on public.communities using gin (address gin_trgm_ops);
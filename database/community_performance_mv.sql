@@ -0,0 +1,25 @@
+-- Snapshot of community_stats_v for GET /dashboard/community-performance.
+-- The live view aggregates every order on each read; this copy is refreshed
+-- every 5 minutes by pg_cron so the endpoint only scans one row per community.
+-- Requires community_stats_view.sql and the pg_cron extension
+-- (Supabase: Database -> Extensions -> pg_cron).
+-- Run this in your Supabase SQL Editor
+
+create materialized view if not exists mv_community_performance as
+select id, name, code, vendor_count, user_count, order_count, revenue
+from community_stats_v;
+
+-- A unique index is required for REFRESH ... CONCURRENTLY, which keeps the
+-- view readable while it is rebuilt
+create unique index if not exists mv_community_performance_id_idx
+    on mv_community_performance (id);
+
+-- Materialized views ignore RLS and security_invoker, so keep this one away
+-- from PostgREST's API roles; the API reads it over DATABASE_URL only
+revoke all on mv_community_performance from anon, authenticated;
+
+select cron.schedule(
+    'refresh-mv-community-performance',
+    '*/5 * * * *',
+    $$refresh materialized view concurrently mv_community_performance$$
+);
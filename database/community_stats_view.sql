@@ -0,0 +1,39 @@
+-- Per-community vendor/user/order totals for GET /communities/stats and
+-- GET /dashboard/community-performance.
+-- Each table is aggregated on its own before joining so users and orders
+-- don't multiply each other's counts. Only active vendors contribute orders.
+create or replace view community_stats_v
+with (security_invoker = true)
+as
+select
+    c.id,
+    c.name,
+    c.code,
+    coalesce(v.vendor_count, 0) as vendor_count,
+    coalesce(u.user_count, 0) as user_count,
+    coalesce(o.order_count, 0) as order_count,
+    coalesce(o.revenue, 0) as revenue
+from communities c
+left join (
+    select community_id, count(*) as vendor_count
+    from vendors
+    where is_active
+    group by community_id
+) v on v.community_id = c.id
+left join (
+    select community_id, count(*) as user_count
+    from users
+    where is_active
+    group by community_id
+) u on u.community_id = c.id
+left join (
+    select
+        vd.community_id,
+        count(*) as order_count,
+        sum(od.total_amount) filter (where od.status = 'completed') as revenue
+    from orders od
+    join vendors vd on vd.id = od.vendor_id
+    where vd.is_active
+    group by vd.community_id
+) o on o.community_id = c.id
+where c.is_active;
@@ -0,0 +1,106 @@
+-- Creates a laundry order for POST /laundry/orders in one round trip.
+-- Item prices and vendor charges are read here, totals (18% GST, rounded to
+-- the paisa) are computed next to the data, and the order and its items are
+-- inserted in the same transaction. Returns the order shaped like
+-- LaundryOrderResponse (items, vendor_business_name, user_name, user_phone).
+-- Unknown vendors/items raise SQLSTATE P0002 with the API's error message.
+-- Run this in your Supabase SQL Editor
+
+create or replace function create_laundry_order(
+    p_user_id uuid,
+    p_laundry_vendor_id uuid,
+    p_pickup_address text,
+    p_pickup_date date,
+    p_pickup_time_slot text,
+    p_pickup_instructions text,
+    p_delivery_address text,
+    p_delivery_instructions text,
+    p_items jsonb
+)
+returns jsonb
+language plpgsql
+volatile
+security invoker
+as $$
+declare
+    v_business_name text;
+    v_pickup_charge numeric;
+    v_delivery_charge numeric;
+    v_missing_item text;
+    v_subtotal numeric;
+    v_tax numeric;
+    v_order laundry_orders;
+begin
+    select business_name, pickup_charge, delivery_charge
+      into v_business_name, v_pickup_charge, v_delivery_charge
+      from laundry_vendors
+     where id = p_laundry_vendor_id;
+
+    if not found then
+        raise exception 'Laundry vendor not found' using errcode = 'P0002';
+    end if;
+
+    select r.laundry_item_id::text
+      into v_missing_item
+      from jsonb_to_recordset(p_items) as r(laundry_item_id uuid)
+      left join laundry_items i on i.id = r.laundry_item_id
+     where i.id is null
+     limit 1;
+
+    if v_missing_item is not null then
+        raise exception 'Item % not found', v_missing_item using errcode = 'P0002';
+    end if;
+
+    select coalesce(sum(i.price_per_piece * r.quantity), 0)
+      into v_subtotal
+      from jsonb_to_recordset(p_items) as r(laundry_item_id uuid, quantity int)
+      join laundry_items i on i.id = r.laundry_item_id;
+
+    v_tax := round((v_subtotal + v_pickup_charge + v_delivery_charge) * 0.18, 2);
+
+    insert into laundry_orders (
+        user_id, laundry_vendor_id, order_number,
+        pickup_address, pickup_date, pickup_time_slot, pickup_instructions,
+        delivery_address, delivery_instructions,
+        subtotal, pickup_charge, delivery_charge, tax_amount, total_amount
+    )
+    values (
+        p_user_id, p_laundry_vendor_id, generate_laundry_order_number(),
+        p_pickup_address, p_pickup_date, p_pickup_time_slot, p_pickup_instructions,
+        coalesce(p_delivery_address, p_pickup_address), p_delivery_instructions,
+        v_subtotal, v_pickup_charge, v_delivery_charge, v_tax,
+        v_subtotal + v_pickup_charge + v_delivery_charge + v_tax
+    )
+    returning * into v_order;
+
+    insert into laundry_order_items (
+        laundry_order_id, laundry_item_id, quantity, unit_price, total_price, special_instructions
+    )
+    select v_order.id, r.laundry_item_id, r.quantity, i.price_per_piece,
+           i.price_per_piece * r.quantity, r.special_instructions
+      from jsonb_to_recordset(p_items) as r(laundry_item_id uuid, quantity int, special_instructions text)
+      join laundry_items i on i.id = r.laundry_item_id;
+
+    return to_jsonb(v_order) || jsonb_build_object(
+        'items', (
+            select coalesce(jsonb_agg(jsonb_build_object(
+                'id', oi.id,
+                'laundry_item_id', oi.laundry_item_id,
+                'quantity', oi.quantity,
+                'unit_price', oi.unit_price,
+                'total_price', oi.total_price,
+                'special_instructions', oi.special_instructions,
+                'item_name', i.name,
+                'item_category', i.category,
+                'item_description', i.description
+            )), '[]'::jsonb)
+            from laundry_order_items oi
+            join laundry_items i on i.id = oi.laundry_item_id
+            where oi.laundry_order_id = v_order.id
+        ),
+        'vendor_business_name', v_business_name,
+        'user_name', (select u.first_name || ' ' || u.last_name from users u where u.id = p_user_id),
+        'user_phone', (select u.phone from users u where u.id = p_user_id)
+    );
+end;
+$$;
@@ -0,0 +1,69 @@
+-- Vendor onboarding for POST /vendors in one round trip and one transaction:
+-- the vendor's login user, the vendor row and (for laundry vendors) the
+-- laundry_vendors profile are created together, so a failure part-way no
+-- longer leaves an orphaned user behind for the API to clean up.
+-- The password is hashed by the API; only the hash is passed in.
+-- Raises SQLSTATE P0001 (mapped to 400 by the API) when the email is taken.
+-- The email check relies on users_email_key (see users_email_unique.sql).
+-- Returns the new vendors row.
+-- Run this in your Supabase SQL Editor
+
+create or replace function create_vendor_with_user(
+    p_name text,
+    p_type vendors.type%type,
+    p_community_id uuid,
+    p_contact_email text,
+    p_contact_phone text,
+    p_address text,
+    p_description text,
+    p_operating_hours vendors.operating_hours%type,
+    p_first_name text,
+    p_last_name text,
+    p_password_hash text
+)
+returns vendors
+language plpgsql
+volatile
+security invoker
+as $$
+declare
+    v_user_id uuid;
+    v_vendor vendors;
+begin
+    insert into users (email, password_hash, first_name, last_name, role, community_id, is_active)
+    values (p_contact_email, p_password_hash, p_first_name, p_last_name, 'vendor', p_community_id, true)
+    on conflict (email) do nothing
+    returning id into v_user_id;
+
+    if v_user_id is null then
+        raise exception 'A user with email % already exists', p_contact_email using errcode = 'P0001';
+    end if;
+
+    insert into vendors (
+        name, type, community_id, admin_id, contact_email, contact_phone,
+        address, description, operating_hours
+    )
+    values (
+        p_name, p_type, p_community_id, v_user_id, p_contact_email, p_contact_phone,
+        p_address, p_description, p_operating_hours
+    )
+    returning * into v_vendor;
+
+    -- No default items are created - vendors add their own
+    if p_type = 'laundry' then
+        insert into laundry_vendors (
+            vendor_id, business_name, description,
+            pickup_time_start, pickup_time_end, delivery_time_hours,
+            minimum_order_amount, pickup_charge, delivery_charge, service_areas
+        )
+        values (
+            v_vendor.id, p_name,
+            coalesce(nullif(p_description, ''), 'Professional laundry services by ' || p_name),
+            '08:00:00', '18:00:00', 24,
+            100.00, 20.00, 30.00, '{}'
+        );
+    end if;
+
+    return v_vendor;
+end;
+$$;
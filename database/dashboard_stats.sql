@@ -0,0 +1,44 @@
+-- Platform-wide totals for GET /dashboard/stats, computed in one round trip
+-- so the API no longer downloads every user and order row to count them.
+-- Run this in your Supabase SQL Editor
+
+create or replace function dashboard_stats()
+returns table (
+    total_communities bigint,
+    total_vendors bigint,
+    total_users bigint,
+    active_users bigint,
+    total_orders bigint,
+    pending_orders bigint,
+    completed_orders bigint,
+    total_revenue numeric
+)
+language sql
+stable
+security invoker
+as $$
+    select
+        (select count(*) from communities where is_active),
+        (select count(*) from vendors where is_active),
+        u.total_users,
+        u.active_users,
+        o.total_orders,
+        o.pending_orders,
+        o.completed_orders,
+        o.total_revenue
+    from (
+        select
+            count(*) as total_users,
+            count(*) filter (where updated_at > now() - interval '7 days') as active_users
+        from users
+        where is_active
+    ) u
+    cross join (
+        select
+            count(*) as total_orders,
+            count(*) filter (where status = 'pending') as pending_orders,
+            count(*) filter (where status = 'completed') as completed_orders,
+            coalesce(sum(total_amount) filter (where status = 'completed'), 0) as total_revenue
+        from orders
+    ) o;
+$$;
@@ -0,0 +1,15 @@
+-- Read-only check used by add_vendor_role.py to see whether an enum type
+-- already has a given label, without inserting probe rows
+create or replace function has_enum_value(t text, v text)
+returns boolean
+language sql
+stable
+as $$
+    select exists (
+        select 1
+        from pg_enum e
+        join pg_type ty on ty.oid = e.enumtypid
+        where ty.typname = t
+          and e.enumlabel = v
+    );
+$$;
@@ -0,0 +1,45 @@
+-- Stats block for GET /laundry/vendors/{vendor_id}/dashboard in one round trip,
+-- so the API no longer downloads every order the vendor has ever had to count
+-- them. Columns match LaundryVendorStats; revenue only counts delivered orders.
+-- Served by laundry_orders_vendor_created_idx and
+-- laundry_items_vendor_available_idx (see performance_indexes.sql).
+-- Run this in your Supabase SQL Editor
+
+create or replace function get_laundry_vendor_stats(p_vendor_id uuid)
+returns table (
+    total_orders bigint,
+    pending_orders bigint,
+    confirmed_orders bigint,
+    in_process_orders bigint,
+    ready_orders bigint,
+    delivered_orders bigint,
+    cancelled_orders bigint,
+    today_revenue numeric,
+    monthly_revenue numeric,
+    active_items bigint
+)
+language sql
+stable
+security invoker
+as $$
+    select
+        count(*),
+        count(*) filter (where status = 'pending'),
+        count(*) filter (where status = 'confirmed'),
+        count(*) filter (where status = 'in_process'),
+        count(*) filter (where status = 'ready'),
+        count(*) filter (where status = 'delivered'),
+        count(*) filter (where status = 'cancelled'),
+        coalesce(sum(total_amount) filter (
+            where status = 'delivered' and created_at::date = current_date
+        ), 0),
+        coalesce(sum(total_amount) filter (
+            where status = 'delivered' and created_at >= date_trunc('month', current_date)
+        ), 0),
+        (
+            select count(*) from laundry_items
+            where laundry_vendor_id = p_vendor_id and is_available
+        )
+    from laundry_orders
+    where laundry_vendor_id = p_vendor_id;
+$$;
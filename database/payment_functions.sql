@@ -0,0 +1,75 @@
+-- Payment writes for POST /payments and POST /payments/{id}/refund, each in
+-- one round trip and one transaction instead of a read plus two or three
+-- separate updates from the API.
+-- Errors use SQLSTATEs the API maps back to HTTP statuses:
+--   P0002 -> 404 (order/payment not found)
+--   42501 -> 403 (order belongs to another user)
+--   P0001 -> 400 (payment is not refundable)
+-- Run this in your Supabase SQL Editor
+
+-- Mock payment processing: the payment is recorded as paid straight away
+-- and its order is confirmed
+create or replace function create_and_confirm_payment(
+    p_order_id uuid,
+    p_user_id uuid,
+    p_amount numeric,
+    p_payment_method text,
+    p_transaction_id text
+)
+returns payments
+language plpgsql
+volatile
+security invoker
+as $$
+declare
+    v_order_user_id uuid;
+    v_payment payments;
+begin
+    select user_id into v_order_user_id from orders where id = p_order_id for update;
+
+    if not found then
+        raise exception 'Order not found' using errcode = 'P0002';
+    end if;
+
+    if v_order_user_id is distinct from p_user_id then
+        raise exception 'Not authorized to create payment for this order' using errcode = '42501';
+    end if;
+
+    insert into payments (order_id, user_id, amount, payment_method, status, transaction_id)
+    values (p_order_id, p_user_id, p_amount, p_payment_method, 'paid', p_transaction_id)
+    returning * into v_payment;
+
+    update orders set status = 'confirmed' where id = p_order_id;
+
+    return v_payment;
+end;
+$$;
+
+-- Refunds a paid payment and cancels its order
+create or replace function refund_payment(p_payment_id uuid)
+returns payments
+language plpgsql
+volatile
+security invoker
+as $$
+declare
+    v_payment payments;
+begin
+    select * into v_payment from payments where id = p_payment_id for update;
+
+    if not found then
+        raise exception 'Payment not found' using errcode = 'P0002';
+    end if;
+
+    if v_payment.status <> 'paid' then
+        raise exception 'Can only refund paid payments' using errcode = 'P0001';
+    end if;
+
+    update payments set status = 'refunded' where id = p_payment_id
+    returning * into v_payment;
+
+    update orders set status = 'cancelled' where id = v_payment.order_id;
+
+    return v_payment;
+end;
+$$;
@@ -0,0 +1,41 @@
+-- Indexes for the filters the API runs on every request
+-- Postgres does not index foreign-key columns on its own, so without these
+-- the per-vendor/per-community/per-user lookups below are sequential scans.
+-- Run this in your Supabase SQL Editor
+
+-- orders: vendor/user/partner listings, community_stats_v's vendor join,
+-- and the created_at windows used by order trends and recent activities
+create index if not exists orders_vendor_id_status_idx on orders (vendor_id, status);
+create index if not exists orders_user_id_idx on orders (user_id);
+create index if not exists orders_partner_id_idx on orders (partner_id);
+create index if not exists orders_created_at_idx on orders (created_at desc);
+
+-- users: per-community counts and dashboard_stats()'s 7-day active users
+create index if not exists users_community_id_active_idx on users (community_id) where is_active;
+create index if not exists users_updated_at_active_idx on users (updated_at desc) where is_active;
+
+-- vendors: per-community counts, vendor-admin ownership checks, type filter
+create index if not exists vendors_community_id_active_idx on vendors (community_id) where is_active;
+create index if not exists vendors_admin_id_idx on vendors (admin_id);
+create index if not exists vendors_type_idx on vendors (type);
+
+-- payments: recent paid payments feed and per-user listing
+create index if not exists payments_paid_created_at_idx on payments (created_at desc) where status = 'paid';
+create index if not exists payments_user_id_idx on payments (user_id);
+
+-- products: vendor catalogue
+create index if not exists products_vendor_id_available_idx on products (vendor_id) where is_available;
+
+-- laundry: vendor dashboards, user order history, order items, vendor catalogue
+create index if not exists laundry_orders_vendor_created_idx on laundry_orders (laundry_vendor_id, created_at desc);
+-- (user_id, created_at desc) also serves the user dashboard's latest-five query
+drop index if exists laundry_orders_user_id_idx;
+create index if not exists laundry_orders_user_created_idx on laundry_orders (user_id, created_at desc);
+create index if not exists laundry_order_items_order_id_idx on laundry_order_items (laundry_order_id);
+-- (laundry_vendor_id, is_available) also covers the available-only catalogue and
+-- the dashboard's active item count, so it replaces the single-column index
+drop index if exists laundry_items_vendor_id_idx;
+create index if not exists laundry_items_vendor_available_idx on laundry_items (laundry_vendor_id, is_available);
+
+analyze orders, users, vendors, payments, products,
+    laundry_orders, laundry_order_items, laundry_items;
@@ -0,0 +1,82 @@
+-- Activity feed for GET /dashboard/recent-activities in one round trip.
+-- Each source keeps the per-source caps the endpoint has always used
+-- (3 new users over 7 days; 3 orders, 2 vendors, 2 payments over 24 hours),
+-- then the merged feed is sorted and cut to limit_n.
+-- Run this in your Supabase SQL Editor
+
+create or replace function recent_activities(limit_n int default 10)
+returns table (
+    id text,
+    type text,
+    message text,
+    "timestamp" timestamptz,
+    icon text,
+    color text
+)
+language sql
+stable
+security invoker
+as $$
+    select * from (
+        (
+            select
+                u.id::text,
+                'new_user',
+                'New user ' || u.first_name || ' ' || u.last_name
+                    || ' registered in ' || coalesce(c.name, 'Unknown Community'),
+                u.created_at,
+                'person-add',
+                '#22c55e'
+            from users u
+            left join communities c on c.id = u.community_id
+            where u.created_at >= now() - interval '7 days'
+            order by u.created_at desc
+            limit 3
+        )
+        union all
+        (
+            select
+                o.id::text,
+                'new_order',
+                'Order #' || left(o.id::text, 8) || ' placed for ' || coalesce(v.name, 'Unknown Vendor'),
+                o.created_at,
+                'bag',
+                '#3b82f6'
+            from orders o
+            left join vendors v on v.id = o.vendor_id
+            where o.created_at >= now() - interval '1 day'
+            order by o.created_at desc
+            limit 3
+        )
+        union all
+        (
+            select
+                v.id::text,
+                'vendor_active',
+                v.name || ' went online',
+                v.updated_at,
+                'checkmark-circle',
+                '#10b981'
+            from vendors v
+            where v.is_active and v.updated_at >= now() - interval '1 day'
+            order by v.updated_at desc
+            limit 2
+        )
+        union all
+        (
+            select
+                p.id::text,
+                'payment',
+                'Payment of $' || p.amount || ' received',
+                p.created_at,
+                'card',
+                '#f59e0b'
+            from payments p
+            where p.status = 'paid' and p.created_at >= now() - interval '1 day'
+            order by p.created_at desc
+            limit 2
+        )
+    ) feed
+    order by 4 desc
+    limit limit_n;
+$$;
@@ -0,0 +1,31 @@
+-- Status change for PUT /orders/{order_id}/status in one round trip: the
+-- order update and its order_status_history row are written in the same
+-- transaction, so history can no longer miss a change.
+-- Raises SQLSTATE P0002 (mapped to 404 by the API) for an unknown order.
+-- p_status takes the column's own type, so it works whether orders.status
+-- is text or an enum.
+-- Run this in your Supabase SQL Editor
+
+create or replace function update_order_status(
+    p_order_id uuid,
+    p_status orders.status%type,
+    p_changed_by uuid
+)
+returns boolean
+language plpgsql
+volatile
+security invoker
+as $$
+begin
+    update orders set status = p_status where id = p_order_id;
+
+    if not found then
+        raise exception 'Order not found' using errcode = 'P0002';
+    end if;
+
+    insert into order_status_history (order_id, status, changed_by)
+    values (p_order_id, p_status, p_changed_by);
+
+    return true;
+end;
+$$;
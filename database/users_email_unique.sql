@@ -0,0 +1,8 @@
+-- User emails must be unique
+-- create_vendor_with_user (POST /vendors) inserts with
+-- ON CONFLICT (email) DO NOTHING and relies on this index to reject a taken
+-- email without a separate lookup, even under concurrent creates.
+-- Run this in your Supabase SQL Editor before create_vendor_with_user.sql
+
+create unique index if not exists users_email_key
+    on public.users (email);
@@ -0,0 +1,25 @@
+-- Per-vendor order totals for GET /vendors/stats and
+-- GET /dashboard/vendor-performance, grouped in Postgres so the
+-- API reads one row per vendor instead of every order.
+-- Revenue only counts completed orders, matching the dashboard figures.
+-- Run this in your Supabase SQL Editor
+create or replace view vendor_stats_v
+with (security_invoker = true)
+as
+select
+    v.id,
+    v.name,
+    v.type,
+    v.is_active,
+    coalesce(o.order_count, 0) as order_count,
+    coalesce(o.revenue, 0) as revenue,
+    v.community_id
+from vendors v
+left join (
+    select
+        vendor_id,
+        count(*) as order_count,
+        sum(total_amount) filter (where status = 'completed') as revenue
+    from orders
+    group by vendor_id
+) o on o.vendor_id = v.id;
@@ -0,0 +1,12 @@
+-- Trigram indexes backing GET /vendors/search
+-- The endpoint filters with name/description ILIKE '%term%', which a plain
+-- b-tree index cannot serve; pg_trgm GIN indexes can.
+-- Run this in your Supabase SQL Editor
+
+create extension if not exists pg_trgm;
+
+create index if not exists vendors_name_trgm_idx
+    on public.vendors using gin (name gin_trgm_ops);
+
+create index if not exists vendors_description_trgm_idx
+    on public.vendors using gin (description gin_trgm_ops);
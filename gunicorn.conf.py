@@ -2,12 +2,17 @@
 # FastAPI should use uvicorn, not gunicorn
 import os
 
-# Use uvicorn worker for ASGI applications like FastAPI
+# Use uvicorn worker for ASGI applications like FastAPI; its "auto" loop/http
+# settings pick uvloop and httptools, which come with uvicorn[standard]
 worker_class = "uvicorn.workers.UvicornWorker"
 bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
-workers = 1
+# One worker unless WEB_CONCURRENCY opts in to more. Each worker opens its own
+# asyncpg pool (up to 10 connections) and keeps its own in-memory caches
+# (user, vendor listing, product and dashboard), which writes and
+# /dashboard/invalidate only clear in the worker that handles them
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 100
 timeout = 30
-keepalive = 2
\ No newline at end of file
+keepalive = 2
@@ -4,8 +4,12 @@ Quick API endpoints listing for CommunityExpress
 """
 
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+PREFIX_RE = re.compile(r'router = APIRouter\(prefix="([^"]*)"')
+ROUTE_RE = re.compile(r'@router\.(get|post|put|delete|patch)\("([^"]*)"')
+
 def extract_routes_from_file(file_path):
     """Extract routes from a router file"""
     try:
@@ -15,12 +19,11 @@ def extract_routes_from_file(file_path):
         routes = []
         
         # Find router prefix
-        prefix_match = re.search(r'router = APIRouter\(prefix="([^"]*)"', content)
+        prefix_match = PREFIX_RE.search(content)
         prefix = prefix_match.group(1) if prefix_match else ""
         
         # Find all route decorators
-        route_pattern = r'@router\.(get|post|put|delete)\("([^"]*)"'
-        matches = re.findall(route_pattern, content)
+        matches = ROUTE_RE.findall(content)
         
         for method, path in matches:
             full_path = f"{prefix}{path}" if path != "/" else prefix + "/"
@@ -40,11 +43,13 @@ def main():
     
     all_routes = []
     
-    for router_file in sorted(router_dir.glob("*.py")):
-        if router_file.name == "__init__.py":
-            continue
-        
-        routes = extract_routes_from_file(router_file)
+    router_files = [f for f in sorted(router_dir.glob("*.py")) if f.name != "__init__.py"]
+    
+    # Read the files concurrently; map() keeps them in sorted order
+    with ThreadPoolExecutor() as executor:
+        file_routes = list(executor.map(extract_routes_from_file, router_files))
+    
+    for router_file, routes in zip(router_files, file_routes):
         if routes:
             print(f"\n📁 {router_file.stem}.py:")
             for method, path in routes:
@@ -5,34 +5,105 @@ This script tests all the newly created laundry APIs
 """
 
 import requests
-import json
-import time
-from datetime import datetime, date, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import orjson
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 
 # API Configuration
 BASE_URL = "http://localhost:8000"
 HEADERS = {"Content-Type": "application/json", "X-Testing": "true"}
 
+# Fixed endpoint URLs, built once
+HEALTH_URL = f"{BASE_URL}/health"
+LOGIN_URL = f"{BASE_URL}/auth/login"
+VENDORS_URL = f"{BASE_URL}/vendors/"
+LAUNDRY_VENDORS_URL = f"{BASE_URL}/laundry/vendors"
+LAUNDRY_ORDERS_URL = f"{BASE_URL}/laundry/orders"
+USER_DASHBOARD_URL = f"{BASE_URL}/laundry/users/dashboard"
+
+# Request bodies that never change, serialized once; sent with data= since
+# the session already carries the JSON Content-Type
+ITEMS_PAYLOAD = orjson.dumps([
+    {
+        "name": "Premium Suit",
+        "description": "High-end suit dry cleaning with special care",
+        "category": "dry_clean",
+        "price_per_piece": 200.00,
+        "estimated_time_hours": 48
+    }
+])
+PAYMENT_PAYLOAD = orjson.dumps({"payment_method": "dummy"})
+# Pickup date for test orders
+TOMORROW_ISO = (date.today() + timedelta(days=1)).isoformat()
+
+class BufferedOutput:
+    """sys.stdout stand-in that holds each test's prints until the test ends
+
+    Tests in a stage run on separate threads; buffering per thread keeps their
+    reports from interleaving and turns each report into a single write.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def start(self):
+        self.local.buffer = io.StringIO()
+    
+    def finish(self):
+        buffer, self.local.buffer = self.local.buffer, None
+        self.stream.write(buffer.getvalue())
+        self.stream.flush()
+
+def parse_json(response):
+    """Decode a response body with orjson instead of the stdlib json module"""
+    return orjson.loads(response.content)
+
 class LaundryAPITester:
     def __init__(self):
+        # One keep-alive session for every call instead of a new connection per request.
+        # Rate limiting is handled by backing off on 429/503 (honouring Retry-After)
+        # rather than pausing after every test; POSTs are never retried
+        retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 503], raise_on_status=False)
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+        self.session.headers.update(HEADERS)
         self.access_token = None
         self.master_token = None
         self.vendor_token = None
         self.vendor_id = None
         self.laundry_vendor_id = None
+        self.laundry_vendor_url = None
         self.community_id = None
         self.created_items = []
         self.created_orders = []
+        # (email, password) -> (token, user); tokens outlive a test run
+        self._token_cache = {}
         
     def login(self, email, password):
         """Login and get access token"""
-        response = requests.post(
-            f"{BASE_URL}/auth/login",
-            json={"email": email, "password": password},
-            headers=HEADERS
+        cached = self._token_cache.get((email, password))
+        if cached:
+            return cached
+        
+        response = self.session.post(
+            LOGIN_URL,
+            json={"email": email, "password": password}
         )
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
+            self._token_cache[(email, password)] = (data["access_token"], data["user"])
             return data["access_token"], data["user"]
         else:
             print(f"Login failed for {email}: {response.text}")
@@ -40,11 +111,12 @@ class LaundryAPITester:
     
     def get_auth_headers(self, token=None):
         """Get headers with authorization or testing mode"""
+        # HEADERS are already on the session; only the token is per request
         if token:
-            return {**HEADERS, "Authorization": f"Bearer {token}"}
+            return {"Authorization": f"Bearer {token}"}
         else:
-            # Return testing headers for localhost testing
-            return HEADERS
+            # Testing headers alone for localhost testing
+            return {}
     
     def test_master_login(self):
         """Test master login"""
@@ -76,14 +148,14 @@ class LaundryAPITester:
             "description": "Professional laundry services with pickup and delivery"
         }
         
-        response = requests.post(
-            f"{BASE_URL}/vendors/",
+        response = self.session.post(
+            VENDORS_URL,
             json=vendor_data,
             headers=self.get_auth_headers(self.master_token)
         )
         
         if response.status_code == 200:
-            vendor = response.json()
+            vendor = parse_json(response)
             self.vendor_id = vendor["id"]
             print(f"✓ Vendor created successfully")
             print(f"  Vendor ID: {self.vendor_id}")
@@ -118,16 +190,17 @@ class LaundryAPITester:
     def test_get_laundry_vendors(self):
         """Test getting laundry vendors"""
         print("\n=== Testing Get Laundry Vendors ===")
-        response = requests.get(
-            f"{BASE_URL}/laundry/vendors",
+        response = self.session.get(
+            LAUNDRY_VENDORS_URL,
             headers=self.get_auth_headers()  # Use testing headers for localhost
         )
         
         if response.status_code == 200:
-            vendors = response.json()
+            vendors = parse_json(response)
             print(f"✓ Retrieved {len(vendors)} laundry vendors")
             if vendors:
                 self.laundry_vendor_id = vendors[0]["id"]
+                self.laundry_vendor_url = f"{LAUNDRY_VENDORS_URL}/{self.laundry_vendor_id}"
                 print(f"  First vendor ID: {self.laundry_vendor_id}")
                 print(f"  Business name: {vendors[0]['business_name']}")
                 print(f"  Pickup charge: ₹{vendors[0]['pickup_charge']}")
@@ -144,13 +217,13 @@ class LaundryAPITester:
             print("✗ No laundry vendor ID available")
             return False
         
-        response = requests.get(
-            f"{BASE_URL}/laundry/vendors/{self.laundry_vendor_id}/items",
+        response = self.session.get(
+            f"{self.laundry_vendor_url}/items",
             headers=self.get_auth_headers()  # Use testing headers for localhost
         )
         
         if response.status_code == 200:
-            items = response.json()
+            items = parse_json(response)
             print(f"✓ Retrieved {len(items)} laundry items")
             for i, item in enumerate(items[:3]):  # Show first 3 items
                 print(f"  {i+1}. {item['name']} - ₹{item['price_per_piece']} ({item['category']})")
@@ -161,37 +234,30 @@ class LaundryAPITester:
             return False
     
     def test_create_laundry_item(self):
-        """Test creating a new laundry item"""
+        """Test creating new laundry items in one bulk request"""
         print("\n=== Testing Create Laundry Item ===")
         if not self.laundry_vendor_id or not self.vendor_token:
             print("✗ Missing laundry vendor ID or vendor token")
             return False
         
-        item_data = {
-            "name": "Premium Suit",
-            "description": "High-end suit dry cleaning with special care",
-            "category": "dry_clean",
-            "price_per_piece": 200.00,
-            "estimated_time_hours": 48
-        }
-        
-        response = requests.post(
-            f"{BASE_URL}/laundry/vendors/{self.laundry_vendor_id}/items",
-            json=item_data,
+        response = self.session.post(
+            f"{self.laundry_vendor_url}/items/bulk",
+            data=ITEMS_PAYLOAD,
             headers=self.get_auth_headers()  # Use testing headers for localhost
         )
         
         if response.status_code == 200:
-            item = response.json()
-            print(f"✓ Laundry item created successfully")
-            print(f"  Item ID: {item['id']}")
-            print(f"  Name: {item['name']}")
-            print(f"  Category: {item['category']}")
-            print(f"  Price: ₹{item['price_per_piece']}")
-            self.created_items.append(item["id"])
+            items = parse_json(response)
+            print(f"✓ {len(items)} laundry item(s) created successfully")
+            for item in items:
+                print(f"  Item ID: {item['id']}")
+                print(f"  Name: {item['name']}")
+                print(f"  Category: {item['category']}")
+                print(f"  Price: ₹{item['price_per_piece']}")
+                self.created_items.append(item["id"])
             return True
         else:
-            print(f"✗ Failed to create laundry item: {response.text}")
+            print(f"✗ Failed to create laundry items: {response.text}")
             return False
     
     def test_create_laundry_order(self):
@@ -207,12 +273,10 @@ class LaundryAPITester:
             print("✗ Failed to get user token for order creation")
             return False
         
-        tomorrow = (datetime.now() + timedelta(days=1)).date()
-        
         order_data = {
             "laundry_vendor_id": self.laundry_vendor_id,
             "pickup_address": "Apartment A-101, Green Valley Community",
-            "pickup_date": tomorrow.isoformat(),
+            "pickup_date": TOMORROW_ISO,
             "pickup_time_slot": "10:00-12:00",
             "pickup_instructions": "Please call before arriving",
             "delivery_address": "Same as pickup address",
@@ -231,14 +295,14 @@ class LaundryAPITester:
             ]
         }
         
-        response = requests.post(
-            f"{BASE_URL}/laundry/orders",
+        response = self.session.post(
+            LAUNDRY_ORDERS_URL,
             json=order_data,
             headers=self.get_auth_headers(user_token)
         )
         
         if response.status_code == 200:
-            order = response.json()
+            order = parse_json(response)
             print(f"✓ Laundry order created successfully")
             print(f"  Order ID: {order['id']}")
             print(f"  Order Number: {order['order_number']}")
@@ -261,14 +325,14 @@ class LaundryAPITester:
         order_id = self.created_orders[0]
         
         # Update order status to confirmed
-        response = requests.put(
-            f"{BASE_URL}/laundry/orders/{order_id}",
+        response = self.session.put(
+            f"{LAUNDRY_ORDERS_URL}/{order_id}",
             json={"status": "confirmed"},
             headers=self.get_auth_headers(self.vendor_token)
         )
         
         if response.status_code == 200:
-            order = response.json()
+            order = parse_json(response)
             print(f"✓ Order status updated successfully")
             print(f"  Order ID: {order['id']}")
             print(f"  New Status: {order['status']}")
@@ -292,18 +356,15 @@ class LaundryAPITester:
             return False
         
         order_id = self.created_orders[0]
-        payment_data = {
-            "payment_method": "dummy"
-        }
         
-        response = requests.post(
-            f"{BASE_URL}/laundry/orders/{order_id}/payment",
-            json=payment_data,
+        response = self.session.post(
+            f"{LAUNDRY_ORDERS_URL}/{order_id}/payment",
+            data=PAYMENT_PAYLOAD,
             headers=self.get_auth_headers(user_token)
         )
         
         if response.status_code == 200:
-            payment = response.json()
+            payment = parse_json(response)
             print(f"✓ Payment processed successfully")
             print(f"  Success: {payment['success']}")
             print(f"  Payment Reference: {payment['payment_reference']}")
@@ -320,13 +381,13 @@ class LaundryAPITester:
             print("✗ Missing laundry vendor ID or vendor token")
             return False
         
-        response = requests.get(
-            f"{BASE_URL}/laundry/vendors/{self.laundry_vendor_id}/dashboard",
+        response = self.session.get(
+            f"{self.laundry_vendor_url}/dashboard",
             headers=self.get_auth_headers(self.vendor_token)
         )
         
         if response.status_code == 200:
-            dashboard = response.json()
+            dashboard = parse_json(response)
             print(f"✓ Vendor dashboard retrieved successfully")
             print(f"  Total Orders: {dashboard['total_orders']}")
             print(f"  Pending Orders: {dashboard['pending_orders']}")
@@ -347,13 +408,13 @@ class LaundryAPITester:
             print("✗ Failed to get user token")
             return False
         
-        response = requests.get(
-            f"{BASE_URL}/laundry/users/dashboard",
+        response = self.session.get(
+            USER_DASHBOARD_URL,
             headers=self.get_auth_headers(user_token)
         )
         
         if response.status_code == 200:
-            dashboard = response.json()
+            dashboard = parse_json(response)
             print(f"✓ User dashboard retrieved successfully")
             print(f"  Total Orders: {dashboard['total_orders']}")
             print(f"  Pending Orders: {dashboard['pending_orders']}")
@@ -373,26 +434,27 @@ class LaundryAPITester:
         # Test with user token
         user_token, _ = self.login("comm@test.com", "test")
         if user_token:
-            response = requests.get(
-                f"{BASE_URL}/laundry/orders",
+            response = self.session.get(
+                LAUNDRY_ORDERS_URL,
                 headers=self.get_auth_headers(user_token)
             )
             
             if response.status_code == 200:
-                orders = response.json()
+                orders = parse_json(response)
                 print(f"✓ User orders retrieved: {len(orders)} orders")
             else:
                 print(f"✗ Failed to get user orders: {response.text}")
         
         # Test with vendor token
         if self.vendor_token and self.laundry_vendor_id:
-            response = requests.get(
-                f"{BASE_URL}/laundry/orders?vendor_id={self.laundry_vendor_id}",
+            response = self.session.get(
+                LAUNDRY_ORDERS_URL,
+                params={"vendor_id": self.laundry_vendor_id},
                 headers=self.get_auth_headers(self.vendor_token)
             )
             
             if response.status_code == 200:
-                orders = response.json()
+                orders = parse_json(response)
                 print(f"✓ Vendor orders retrieved: {len(orders)} orders")
                 return True
             else:
@@ -401,6 +463,17 @@ class LaundryAPITester:
         
         return True
     
+    def run_test(self, output, test_name, test_func):
+        """Run one test, reporting an exception as a failure"""
+        output.start()
+        try:
+            return bool(test_func())
+        except Exception as e:
+            print(f"✗ {test_name} failed with exception: {str(e)}")
+            return False
+        finally:
+            output.finish()
+    
     def run_all_tests(self):
         """Run all API tests"""
         print("🧪 Starting Comprehensive Laundry API Tests")
@@ -408,35 +481,39 @@ class LaundryAPITester:
         print("🔧 Using X-Testing header for localhost testing (bypasses authentication)")
         print("=" * 50)
         
-        tests = [
-            ("Master Login", self.test_master_login),
-            ("Create Vendor with Auto-Login", self.test_create_vendor),
-            ("Vendor Login", self.test_vendor_login),
-            ("Get Laundry Vendors", self.test_get_laundry_vendors),
-            ("Get Laundry Items", self.test_get_laundry_items),
-            ("Create Laundry Item", self.test_create_laundry_item),
-            ("Create Laundry Order", self.test_create_laundry_order),
-            ("Update Order Status", self.test_update_order_status),
-            ("Process Payment", self.test_process_payment),
-            ("Vendor Dashboard", self.test_vendor_dashboard),
-            ("User Dashboard", self.test_user_dashboard),
-            ("Get Orders", self.test_get_orders),
+        # Each stage depends on state set by the ones before it; tests within
+        # a stage are independent and run concurrently
+        stages = [
+            [("Master Login", self.test_master_login)],
+            [("Create Vendor with Auto-Login", self.test_create_vendor)],
+            [("Vendor Login", self.test_vendor_login)],
+            [("Get Laundry Vendors", self.test_get_laundry_vendors)],
+            [("Get Laundry Items", self.test_get_laundry_items)],
+            [("Create Laundry Item", self.test_create_laundry_item)],
+            [("Create Laundry Order", self.test_create_laundry_order)],
+            [("Update Order Status", self.test_update_order_status)],
+            [("Process Payment", self.test_process_payment)],
+            [
+                ("Vendor Dashboard", self.test_vendor_dashboard),
+                ("User Dashboard", self.test_user_dashboard),
+                ("Get Orders", self.test_get_orders),
+            ],
         ]
         
         passed = 0
         failed = 0
         
-        for test_name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                print(f"✗ {test_name} failed with exception: {str(e)}")
-                failed += 1
-            
-            time.sleep(1)  # Brief pause between tests
+        output = BufferedOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            for stage in stages:
+                with ThreadPoolExecutor(max_workers=len(stage)) as pool:
+                    results = list(pool.map(lambda test: self.run_test(output, *test), stage))
+                
+                passed += results.count(True)
+                failed += results.count(False)
+        finally:
+            sys.stdout = output.stream
         
         print("\n" + "=" * 50)
         print(f"🎯 Test Results: {passed} passed, {failed} failed")
@@ -459,9 +536,11 @@ def main():
     print("Starting Laundry API Test Suite...")
     print("Make sure the FastAPI server is running on http://localhost:8000")
     
+    tester = LaundryAPITester()
+    
     # Check if server is running
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = tester.session.get(HEALTH_URL)
         if response.status_code != 200:
             print("❌ Server is not responding properly")
             return
@@ -471,7 +550,6 @@ def main():
     
     print("✅ Server is running, starting tests...\n")
     
-    tester = LaundryAPITester()
     passed, failed = tester.run_all_tests()
     
     if failed == 0: